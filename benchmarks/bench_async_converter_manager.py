@@ -0,0 +1,100 @@
+"""Benchmark of event loop responsiveness during concurrent conversions.
+
+A heartbeat coroutine sleeps for 1 ms in a loop and records how late it wakes
+up while large TES tasks are converted concurrently, either directly on the
+event loop or through ``AsyncConverterManager``.
+
+Usage:
+    $ python benchmarks/bench_async_converter_manager.py --tasks 16 --inputs 50000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from crategen.async_converter_manager import AsyncConverterManager
+from crategen.converter_manager import ConverterManager
+
+HEARTBEAT_INTERVAL = 0.001
+
+
+def make_task(index, inputs):
+    """Return a TES task with the given number of inputs and outputs."""
+    files = [
+        {"url": f"s3://bucket/{index}/file-{i}", "path": f"/data/file-{i}"}
+        for i in range(inputs)
+    ]
+    return {
+        "id": f"task-{index}",
+        "executors": [{"image": "ubuntu:20.04"}],
+        "inputs": files,
+        "outputs": files,
+        "creation_time": "2024-10-15T18:14:34.948996+00:00",
+    }
+
+
+async def heartbeat(lags, stop):
+    """Record how late each heartbeat wakes up, in milliseconds."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        lags.append((time.perf_counter() - start - HEARTBEAT_INTERVAL) * 1000)
+
+
+async def run_blocking(tasks):
+    """Convert on the event loop thread, as a plain ConverterManager call would."""
+    manager = ConverterManager()
+
+    async def convert(task):
+        await asyncio.sleep(0)
+        return manager.convert_tes_to_wrroc(task)
+
+    return await asyncio.gather(*(convert(task) for task in tasks))
+
+
+async def run_async(tasks, executor=None):
+    """Convert through AsyncConverterManager."""
+    async with AsyncConverterManager(executor=executor) as manager:
+        return await manager.convert_many("tes-to-wrroc", tasks)
+
+
+async def measure(name, run, tasks):
+    """Run a conversion strategy next to the heartbeat and print lag statistics."""
+    lags = []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(lags, stop))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await run(tasks)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99)] if lags else 0.0
+    print(
+        f"{name:<28} total {elapsed:7.3f} s  heartbeats {len(lags):6d}"
+        f"  median lag {statistics.median(lags or [0]):8.2f} ms"
+        f"  p99 lag {p99:8.2f} ms  max lag {max(lags or [0]):8.2f} ms"
+    )
+
+
+async def main(args):
+    """Run all strategies on the same payloads."""
+    tasks = [make_task(index, args.inputs) for index in range(args.tasks)]
+    await measure("blocking ConverterManager", run_blocking, tasks)
+    await measure("AsyncConverterManager", run_async, tasks)
+    with ProcessPoolExecutor() as executor:
+
+        async def run_processes(tasks):
+            return await run_async(tasks, executor=executor)
+
+        await measure("AsyncConverterManager+procs", run_processes, tasks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=16)
+    parser.add_argument("--inputs", type=int, default=50_000)
+    asyncio.run(main(parser.parse_args()))
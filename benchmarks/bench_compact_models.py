@@ -0,0 +1,65 @@
+"""Benchmark of memory used by validated TES tasks.
+
+Compares a task validated with the pydantic ``TESData`` model against the same
+task stored with ``compact_task``, measuring the memory retained by the
+validated result and the peak during validation with ``tracemalloc``.
+
+Usage:
+    $ python benchmarks/bench_compact_models.py --inputs 100000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from crategen.models import TESData, compact_task
+
+
+def make_task(inputs):
+    """Return a TES task with the given number of inputs, outputs and output logs."""
+    files = [
+        {"url": f"s3://bucket/data/file-{i}.txt", "path": f"/data/file-{i}.txt"}
+        for i in range(inputs)
+    ]
+    return {
+        "id": "task",
+        "state": "COMPLETE",
+        "executors": [{"image": "ubuntu:20.04", "command": ["true"]}],
+        "inputs": files,
+        "outputs": files,
+        "creation_time": "2024-10-15T18:14:34.948996+00:00",
+        "logs": [
+            {
+                "start_time": "2024-10-15T18:14:34.948996+00:00",
+                "end_time": "2024-10-15T19:01:06.872464+00:00",
+                "logs": [{"exit_code": 0}],
+                "outputs": [{**file, "size_bytes": "1024"} for file in files],
+            }
+        ],
+    }
+
+
+def measure(name, validate, task):
+    """Validate a task and print retained memory, peak memory and elapsed time."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    validated = validate(task)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:<10} retained {retained / 2**20:8.1f} MiB"
+        f"  peak {peak / 2**20:8.1f} MiB  time {elapsed:6.2f} s"
+    )
+    del validated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inputs", type=int, default=100_000)
+    args = parser.parse_args()
+    task = make_task(args.inputs)
+    measure("TESData", lambda data: TESData(**data), task)
+    measure("compact", compact_task, task)
@@ -0,0 +1,242 @@
+"""Streaming writer for zipped RO-Crate archives.
+
+The metadata file of an archive is an RO-Crate document: the metadata
+descriptor, a root data entity whose ``hasPart`` lists the files of the
+archive, the converted ``CreateAction`` and one ``File`` entity per file.
+"""
+
+import io
+import json
+import os
+import queue
+import threading
+import zipfile
+from urllib.parse import unquote, urlparse
+
+from .rocrate import (
+    METADATA_DESCRIPTOR_ID,
+    RO_CRATE_CONTEXT,
+    metadata_descriptor,
+    root_data_entity,
+)
+from .validation import CREATE_ACTION_TYPE
+
+METADATA_FILE_NAME = METADATA_DESCRIPTOR_ID
+DATA_DIRECTORY = "data"
+LOGS_DIRECTORY = "logs"
+MIN_COMPRESSION_LEVEL = 0
+MAX_COMPRESSION_LEVEL = 9
+DEFAULT_COMPRESSION_LEVEL = 6
+CHUNK_SIZE = 1024 * 1024
+LARGE_MEMBER_SIZE = 8 * CHUNK_SIZE
+
+_DATA_PROPERTIES = ("object", "result")
+_LOG_PROPERTIES = ("stdout", "stderr")
+
+
+def log_paths(data):
+    """Return the local stdout and stderr files referenced by TES or WES data.
+
+    TES executor logs and WES run and task logs may hold the absolute path or
+    ``file://`` URL of a log file. Inline log content, relative paths and
+    remote URLs are skipped.
+
+    Args:
+        data: The TES task or WES run that was converted.
+
+    Returns:
+        list: The local log file paths, without duplicates.
+    """
+    logs = []
+    for task_log in data.get("logs") or []:
+        logs.extend(task_log.get("logs") or [])
+    run_log = data.get("run_log")
+    if run_log:
+        logs.append(run_log)
+    logs.extend(data.get("task_logs") or [])
+
+    paths = []
+    for log in logs:
+        for prop in _LOG_PROPERTIES:
+            path = _local_path(log.get(prop) or "")
+            if path is not None and os.path.isabs(path) and path not in paths:
+                paths.append(path)
+    return paths
+
+
+def write_crate_archive(
+    wrroc_data,
+    archive_path,
+    include_data=False,
+    compression_level=DEFAULT_COMPRESSION_LEVEL,
+    log_files=(),
+):
+    """Stream WRROC data, and optionally referenced local files, into a zip archive.
+
+    The converted entity is wrapped in an RO-Crate ``@graph`` with the metadata
+    descriptor, a root data entity and a ``File`` entity per copied file. The
+    metadata file is serialized directly into its archive member and local
+    files are copied in fixed-size chunks, so neither is held in memory as a
+    whole. Members larger than ``LARGE_MEMBER_SIZE`` are compressed on a worker
+    thread while the calling thread keeps reading the source file.
+
+    Args:
+        wrroc_data: The converted WRROC data. It is typed as a ``CreateAction``
+            if it has no ``@type``.
+        archive_path: Path of the zip archive to create.
+        include_data: Whether to add local files referenced by ``object`` and
+            ``result`` entities to the archive.
+        compression_level: Deflate compression level from 0 (none) to 9 (best).
+        log_files: Local log files to add under ``logs/``, for example the
+            result of ``log_paths``.
+
+    Returns:
+        list: The archive member names that were written.
+    """
+    if not MIN_COMPRESSION_LEVEL <= compression_level <= MAX_COMPRESSION_LEVEL:
+        raise ValueError(
+            f"The compression level must be between {MIN_COMPRESSION_LEVEL} and {MAX_COMPRESSION_LEVEL}."
+        )
+
+    local_files = _collect_local_files(wrroc_data) if include_data else {}
+    if local_files:
+        wrroc_data = _relocate_data_entities(wrroc_data, local_files)
+    log_members = _unique_names(log_files, LOGS_DIRECTORY)
+
+    members = [METADATA_FILE_NAME]
+    with zipfile.ZipFile(
+        archive_path,
+        "w",
+        compression=zipfile.ZIP_DEFLATED,
+        compresslevel=compression_level,
+    ) as archive:
+        with (
+            archive.open(METADATA_FILE_NAME, "w", force_zip64=True) as member,
+            io.TextIOWrapper(member, encoding="utf-8") as text_member,
+        ):
+            document = _crate_document(wrroc_data, {**local_files, **log_members})
+            json.dump(document, text_member, indent=4)
+
+        for source_path, arcname in (*local_files.items(), *log_members.items()):
+            _write_member(archive, source_path, arcname)
+            members.append(arcname)
+    return members
+
+
+def _crate_document(wrroc_data, members):
+    """Wrap converted WRROC data and the archived files in an RO-Crate document."""
+    entity = {"@id": wrroc_data.get("@id"), "@type": CREATE_ACTION_TYPE, **wrroc_data}
+    files = [
+        {"@id": arcname, "@type": "File", "name": os.path.basename(source_path)}
+        for source_path, arcname in members.items()
+    ]
+    root = root_data_entity()
+    if entity["@id"]:
+        root["mentions"] = {"@id": entity["@id"]}
+    root["hasPart"] = [{"@id": file["@id"]} for file in files]
+    return {
+        "@context": RO_CRATE_CONTEXT,
+        "@graph": [metadata_descriptor(), root, entity, *files],
+    }
+
+
+def _collect_local_files(wrroc_data):
+    """Map local files referenced by data entities to unique archive member names."""
+    paths = [
+        _local_path(entity.get("@id", ""))
+        for prop in _DATA_PROPERTIES
+        for entity in wrroc_data.get(prop) or []
+    ]
+    return _unique_names([path for path in paths if path is not None], DATA_DIRECTORY)
+
+
+def _unique_names(paths, directory):
+    """Map local files to unique archive member names below a directory."""
+    members = {}
+    used_names = set()
+    for path in paths:
+        if path in members:
+            continue
+        base, ext = os.path.splitext(os.path.basename(path))
+        arcname = f"{directory}/{base}{ext}"
+        suffix = 1
+        while arcname in used_names:
+            arcname = f"{directory}/{base}_{suffix}{ext}"
+            suffix += 1
+        used_names.add(arcname)
+        members[path] = arcname
+    return members
+
+
+def _local_path(identifier):
+    """Return the local file path for an entity identifier, or None if it is not a local file."""
+    if not identifier:
+        return None
+    parsed = urlparse(identifier)
+    if parsed.scheme == "file":
+        path = unquote(parsed.path)
+    elif parsed.scheme and len(parsed.scheme) > 1:
+        return None
+    else:
+        path = identifier
+    return path if os.path.isfile(path) else None
+
+
+def _relocate_data_entities(wrroc_data, local_files):
+    """Return a copy of the WRROC data with local entity identifiers pointing into the archive."""
+    relocated = dict(wrroc_data)
+    for prop in _DATA_PROPERTIES:
+        if not wrroc_data.get(prop):
+            continue
+        entities = []
+        for entity in wrroc_data[prop]:
+            path = _local_path(entity.get("@id", ""))
+            if path in local_files:
+                entities.append({**entity, "@id": local_files[path]})
+            else:
+                entities.append(entity)
+        relocated[prop] = entities
+    return relocated
+
+
+def _write_member(archive, source_path, arcname):
+    """Copy a local file into the archive in chunks."""
+    size = os.path.getsize(source_path)
+    with (
+        open(source_path, "rb") as source,
+        archive.open(arcname, "w", force_zip64=True) as member,
+    ):
+        if size < LARGE_MEMBER_SIZE:
+            while chunk := source.read(CHUNK_SIZE):
+                member.write(chunk)
+        else:
+            _copy_on_worker_thread(source, member)
+
+
+def _copy_on_worker_thread(source, member):
+    """Read chunks on the calling thread and compress them on a worker thread.
+
+    The queue is bounded so at most a few chunks are in flight at any time.
+    """
+    chunks = queue.Queue(maxsize=4)
+    errors = []
+
+    def compress():
+        while (chunk := chunks.get()) is not None:
+            if errors:
+                continue
+            try:
+                member.write(chunk)
+            except BaseException as exc:
+                errors.append(exc)
+
+    worker = threading.Thread(target=compress, name="crategen-archive", daemon=True)
+    worker.start()
+    try:
+        while not errors and (chunk := source.read(CHUNK_SIZE)):
+            chunks.put(chunk)
+    finally:
+        chunks.put(None)
+        worker.join()
+    if errors:
+        raise errors[0]
@@ -0,0 +1,177 @@
+"""asyncio-native manager for TES and WES to WRROC conversions."""
+
+import asyncio
+import collections
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .converter_manager import ConverterManager
+
+
+@functools.cache
+def _manager(fields, check_every):
+    """Return the converter manager shared by the executor workers of this process."""
+    return ConverterManager(fields=fields, check_every=check_every)
+
+
+def _convert(conversion_type, data, fields, check_every):
+    return _manager(fields, check_every).convert(conversion_type, data)
+
+
+class AsyncConverterManager:
+    """Runs conversions on a bounded executor without blocking the event loop.
+
+    At most ``max_pending`` conversions are submitted to the executor at any
+    time; further calls wait for a free slot, which applies backpressure to
+    producers. Cancelling a call that is still waiting for a slot or for the
+    executor drops the conversion; a conversion that already started runs to
+    completion and its result is discarded.
+
+    Attributes:
+        max_pending: Maximum number of conversions submitted to the executor.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        executor=None,
+        max_workers=None,
+        max_pending=None,
+        fields=None,
+        check_every=None,
+    ):
+        """Initializes the executor and the backpressure limit.
+
+        Args:
+            executor: A ``concurrent.futures.Executor`` to run conversions on,
+                for example a ``ProcessPoolExecutor`` for CPU-bound workloads.
+                Defaults to a thread pool owned by this manager.
+            max_workers: Number of threads of the default executor. Defaults to
+                the number of CPUs.
+            max_pending: Maximum number of conversions submitted to the
+                executor at once. Defaults to twice the number of workers.
+            fields: WRROC properties to compute, or None for all of them.
+            check_every: Validate one converted record out of this many against
+                the profile. No validation if None or 0.
+        """
+        workers = max_workers or os.cpu_count() or 1
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="crategen-async"
+        )
+        self.max_pending = max_pending or 2 * workers
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._fields = None if fields is None else tuple(fields)
+        self._check_every = check_every
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Shuts down the executor if it is owned by this manager."""
+        if self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def convert(self, conversion_type, data):
+        """Converts data according to the given conversion type.
+
+        Args:
+            conversion_type: Type of conversion to perform. Choices are "tes-to-wrroc" and "wes-to-wrroc".
+            data: The TES or WES data to be converted.
+
+        Returns:
+            The converted data in WRROC format.
+        """
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor,
+                _convert,
+                conversion_type,
+                data,
+                self._fields,
+                self._check_every,
+            )
+
+    async def convert_tes_to_wrroc(self, tes_data):
+        """Converts TES data to WRROC format.
+
+        Args:
+            tes_data: The TES data to be converted.
+
+        Returns:
+            The converted data in WRROC format.
+        """
+        return await self.convert("tes-to-wrroc", tes_data)
+
+    async def convert_wes_to_wrroc(self, wes_data):
+        """Converts WES data to WRROC format.
+
+        Args:
+            wes_data: The WES data to be converted.
+
+        Returns:
+            The converted data in WRROC format.
+        """
+        return await self.convert("wes-to-wrroc", wes_data)
+
+    async def convert_many(self, conversion_type, items):
+        """Converts several payloads concurrently.
+
+        If one conversion fails, the remaining ones are cancelled.
+
+        Args:
+            conversion_type: Type of conversion to perform.
+            items: The TES or WES payloads to be converted.
+
+        Returns:
+            list: The converted data, in the order of ``items``.
+
+        Raises:
+            ExceptionGroup: If any of the conversions failed.
+        """
+        async with asyncio.TaskGroup() as group:
+            tasks = [
+                group.create_task(self.convert(conversion_type, item)) for item in items
+            ]
+        return [task.result() for task in tasks]
+
+    async def stream(self, conversion_type, items):
+        """Converts payloads from a sync or async iterable as they arrive.
+
+        No more than ``max_pending`` payloads are pulled from ``items`` ahead of
+        the consumer, so a slow consumer slows down the producer instead of
+        buffering an unbounded number of results.
+
+        Args:
+            conversion_type: Type of conversion to perform.
+            items: An iterable or async iterable of TES or WES payloads.
+
+        Yields:
+            The converted data, in the order of ``items``.
+        """
+        pending = collections.deque()
+        try:
+            async for item in _aiter(items):
+                pending.append(
+                    asyncio.ensure_future(self.convert(conversion_type, item))
+                )
+                if len(pending) >= self.max_pending:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+async def _aiter(items):
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
@@ -0,0 +1,169 @@
+"""Parallel conversion of many TES/WES JSON files."""
+
+import functools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .checkpoint import CheckpointJournal, conversion_options, fsync_path
+from .compression import open_input, open_output, strip_compression_extension
+from .converter_manager import ConverterManager
+
+JOURNAL_NAME = ".crategen-batch.journal"
+
+
+@functools.cache
+def _manager(fields, check_every):
+    """Return the converter manager shared by the conversions of this process.
+
+    Sharing it lets sampled validation span all files a worker converts.
+    """
+    return ConverterManager(fields=fields, check_every=check_every)
+
+
+def output_path_for(input_path, output_dir, extension=""):
+    """Return the output path for an input file in batch mode.
+
+    The compression extension of the input, if any, is dropped and
+    ``extension`` is appended instead.
+
+    Args:
+        input_path: Path to the input file.
+        output_dir: Directory the output files are written to.
+        extension: Extension to append, for example ".gz" to compress the output.
+
+    Returns:
+        str: The output path.
+    """
+    name = os.path.basename(strip_compression_extension(input_path))
+    return os.path.join(output_dir, name + extension)
+
+
+def convert_file(  # noqa: PLR0913
+    input_path,
+    output_path,
+    conversion_type,
+    durable=False,
+    fields=None,
+    check_every=None,
+):
+    """Convert a single, possibly compressed, JSON file.
+
+    Args:
+        input_path: Path to the input JSON file.
+        output_path: Path to the output JSON file.
+        conversion_type: Type of conversion to perform.
+        durable: Whether to write the output to a temporary file, sync it and
+            atomically move it into place, so a crash never leaves a partial
+            output behind.
+        fields: WRROC properties to compute, or None for all of them.
+        check_every: Validate one output out of this many against the profile.
+            No validation if None or 0.
+
+    Returns:
+        str: The output path.
+    """
+    with open_input(input_path) as input_file:
+        data = json.load(input_file)
+    fields = None if fields is None else tuple(fields)
+    result = _manager(fields, check_every).convert(conversion_type, data)
+    directory, name = os.path.split(output_path)
+    write_path = os.path.join(directory, f".tmp-{name}") if durable else output_path
+    with open_output(write_path) as output_file:
+        json.dump(result, output_file, indent=4)
+    if durable:
+        fsync_path(write_path)
+        os.replace(write_path, output_path)
+    return output_path
+
+
+def convert_files(  # noqa: PLR0913
+    input_paths,
+    output_dir,
+    conversion_type,
+    workers=None,
+    extension="",
+    checkpoint=True,
+    resume=False,
+    fields=None,
+    check_every=None,
+):
+    """Convert many JSON files in parallel across worker processes.
+
+    Each worker reads, decompresses, converts and writes whole files, so
+    decompression of different files runs in parallel. With ``checkpoint``,
+    every finished input is recorded in a journal in ``output_dir`` so that a
+    later run with ``resume`` skips it without reading it again. A journal of
+    other conversion options is discarded. The journal is removed once all
+    inputs are converted.
+
+    Args:
+        input_paths: Paths to the input JSON files.
+        output_dir: Directory the output files are written to.
+        conversion_type: Type of conversion to perform.
+        workers: Number of worker processes. Defaults to the number of CPUs.
+        extension: Extension appended to every output file name.
+        checkpoint: Whether to write outputs durably and journal progress.
+        resume: Whether to skip inputs recorded in an existing journal.
+        fields: WRROC properties to compute, or None for all of them.
+        check_every: Validate one output out of this many against the profile.
+            No validation if None or 0.
+
+    Returns:
+        list: The output paths, in the order of the inputs.
+
+    Raises:
+        ValueError: If two inputs map to the same output path.
+        WRROCValidationError: If a validated output violates the profile.
+    """
+    output_paths = [
+        output_path_for(path, output_dir, extension) for path in input_paths
+    ]
+    if len(set(output_paths)) != len(output_paths):
+        raise ValueError("Input files must have distinct names in batch mode.")
+    if not input_paths:
+        return []
+
+    os.makedirs(output_dir, exist_ok=True)
+    journal = CheckpointJournal(os.path.join(output_dir, JOURNAL_NAME))
+    header = {"options": conversion_options(conversion_type, fields, check_every)}
+    entries = journal.read() if resume else []
+    resumed = bool(entries) and entries[0] == header
+    done = set()
+    if resumed:
+        done = {entry["input"] for entry in entries[1:] if "input" in entry}
+    else:
+        journal.remove()
+    pending = [
+        (input_path, output_path)
+        for input_path, output_path in zip(input_paths, output_paths, strict=True)
+        if os.path.abspath(input_path) not in done or not os.path.exists(output_path)
+    ]
+
+    if checkpoint:
+        journal.open()
+        if not resumed:
+            journal.record(header, sync=True)
+    try:
+        workers = max(1, min(workers or os.cpu_count() or 1, len(pending)))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    convert_file,
+                    input_path,
+                    output_path,
+                    conversion_type,
+                    durable=checkpoint,
+                    fields=fields,
+                    check_every=check_every,
+                ): input_path
+                for input_path, output_path in pending
+            }
+            for future in as_completed(futures):
+                future.result()
+                if checkpoint:
+                    journal.record({"input": os.path.abspath(futures[future])})
+    finally:
+        journal.close()
+    journal.remove()
+    return output_paths
@@ -0,0 +1,130 @@
+"""Append-only progress journals for resumable batch and NDJSON conversions.
+
+A journal is a file of JSON lines. Every entry is appended with a single
+``os.write`` on a descriptor opened with ``O_APPEND``, so worker processes can
+share one journal, and a torn last line left by a crash is ignored on read.
+"""
+
+import json
+import os
+import time
+
+DEFAULT_SYNC_INTERVAL = 1.0
+
+
+def conversion_options(conversion_type, fields=None, check_every=None, **options):
+    """Return the options of a conversion job in the form recorded in journals.
+
+    Resuming a job with other options would mix two output shapes in one
+    result, so journals record these options and are discarded on a mismatch.
+
+    Args:
+        conversion_type: Type of conversion to perform.
+        fields: WRROC properties to compute, or None for all of them.
+        check_every: Profile validation interval, or None or 0 for none.
+        **options: Further options that change the output, as JSON-serializable values.
+
+    Returns:
+        dict: The normalized options.
+    """
+    return {
+        "conversion_type": conversion_type,
+        "fields": None if fields is None else sorted(fields),
+        "check_every": check_every or 0,
+        **options,
+    }
+
+
+def fsync_path(path):
+    """Flush a file that was already closed to stable storage.
+
+    Args:
+        path: Path of the file.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class CheckpointJournal:
+    """Append-only journal of completed work.
+
+    Entries are written immediately but only synced to disk at most once per
+    ``sync_interval`` seconds, unless ``record`` is asked to sync. Losing
+    unsynced entries in a crash only means that some finished work is redone.
+
+    Attributes:
+        path: Path of the journal file.
+        sync_interval: Minimum number of seconds between two syncs.
+    """
+
+    def __init__(self, path, sync_interval=DEFAULT_SYNC_INTERVAL):
+        """Initializes a journal without opening it.
+
+        Args:
+            path: Path of the journal file.
+            sync_interval: Minimum number of seconds between two syncs.
+        """
+        self.path = path
+        self.sync_interval = sync_interval
+        self._fd = None
+        self._last_sync = 0.0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def open(self):
+        """Opens the journal for appending, creating it if needed."""
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        """Syncs and closes the journal."""
+        if self._fd is not None:
+            os.fsync(self._fd)
+            os.close(self._fd)
+            self._fd = None
+
+    def record(self, entry, sync=False):
+        """Appends an entry to the journal.
+
+        Args:
+            entry: A JSON-serializable dict.
+            sync: Whether to sync the journal immediately.
+        """
+        os.write(self._fd, (json.dumps(entry, separators=(",", ":")) + "\n").encode())
+        now = time.monotonic()
+        if sync or now - self._last_sync >= self.sync_interval:
+            os.fsync(self._fd)
+            self._last_sync = now
+
+    def read(self):
+        """Reads all complete entries of the journal.
+
+        Returns:
+            list: The journal entries, oldest first. Empty if there is no journal.
+        """
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, "rb") as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break
+        return entries
+
+    def remove(self):
+        """Deletes the journal file if it exists."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
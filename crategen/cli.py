@@ -4,44 +4,573 @@ import json
 
 import click
 
-from crategen.converter_manager import ConverterManager
+from crategen.archive import (
+    DEFAULT_COMPRESSION_LEVEL,
+    MAX_COMPRESSION_LEVEL,
+    MIN_COMPRESSION_LEVEL,
+    log_paths,
+    write_crate_archive,
+)
+from crategen.batch import convert_files
+from crategen.compression import EXTENSIONS, open_input, open_output
+from crategen.converter_manager import (
+    CONVERSION_TYPES,
+    SUPPORTED_FIELDS,
+    ConverterManager,
+)
+from crategen.index import CrateIndex
+from crategen.merge import DEFAULT_MAX_ENTITIES, merge_crates
+from crategen.ndjson import convert_ndjson
+from crategen.server import create_server
+from crategen.validation import ProfileValidator, ValidationIssue, iter_records
+
+
+class DefaultCommandGroup(click.Group):
+    """Command group that runs ``convert`` when no subcommand is given.
+
+    This keeps ``crategen --input ... --output ...`` working alongside subcommands.
+    """
+
+    default_command = "convert"
+
+    def parse_args(self, ctx, args):
+        """Prepends the default command unless a subcommand or help is requested."""
+        if not args or (args[0] not in self.commands and args[0] != "--help"):
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
 
+def _parse_fields(ctx, param, value):
+    """Splits a comma-separated list of WRROC fields."""
+    if value is None:
+        return None
+    fields = tuple(field.strip() for field in value.split(",") if field.strip())
+    if not fields:
+        raise click.BadParameter("must name at least one WRROC property.")
+    return fields
+
+
+def _check_fields(fields, conversion_types):
+    """Rejects fields that none of the given conversion types can compute.
+
+    Args:
+        fields: The parsed ``--fields`` value, or None.
+        conversion_types: The conversion types the fields are used with.
+
+    Raises:
+        click.BadParameter: If a field is not supported.
+    """
+    if fields is None:
+        return
+    supported = list(
+        dict.fromkeys(
+            field
+            for conversion_type in conversion_types
+            for field in SUPPORTED_FIELDS[conversion_type]
+        )
+    )
+    unknown = [field for field in fields if field not in supported]
+    if unknown:
+        raise click.BadParameter(
+            f"unsupported WRROC fields for {', '.join(conversion_types)}: "
+            f"{', '.join(unknown)}. Supported fields are: {', '.join(supported)}.",
+            param_hint="'--fields'",
+        )
+
+
+fields_option = click.option(
+    "--fields",
+    callback=_parse_fields,
+    help="Comma-separated WRROC properties to compute, for example '@id,status'. Defaults to all.",
+)
 
-@click.command()
-@click.option("--input", prompt="Input file", help="Path to the input JSON file.")
-@click.option("--output", prompt="Output file", help="Path to the output JSON file.")
+check_every_option = click.option(
+    "--check-every",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="Validate one converted record out of this many against the WRROC profile"
+    " and fail on violations. 0 disables validation.",
+)
+
+
+@click.group(cls=DefaultCommandGroup)
+def cli():
+    """Command Line Interface for converting TES/WES to WRROC."""
+
+
+@cli.command()
+@click.option(
+    "--input",
+    prompt="Input file",
+    help="Path to the input JSON file, optionally compressed.",
+)
+@click.option(
+    "--output",
+    help="Path to the output JSON file. Compressed if it ends in .gz, .bz2 or .xz.",
+)
+@click.option(
+    "--output-archive",
+    help="Path to a zip archive to stream the RO-Crate into instead of writing JSON.",
+)
+@click.option(
+    "--include-data",
+    is_flag=True,
+    help="Add local files referenced by the crate to the output archive.",
+)
+@click.option(
+    "--include-logs",
+    is_flag=True,
+    help="Add local stdout and stderr files referenced by the input logs to the output archive.",
+)
+@click.option(
+    "--compression-level",
+    type=click.IntRange(MIN_COMPRESSION_LEVEL, MAX_COMPRESSION_LEVEL),
+    default=DEFAULT_COMPRESSION_LEVEL,
+    show_default=True,
+    help="Deflate compression level for the output archive.",
+)
 @click.option(
     "--conversion-type",
     prompt="Conversion type",
-    type=click.Choice(["tes-to-wrroc", "wes-to-wrroc"]),
+    type=click.Choice(CONVERSION_TYPES),
     help="Type of conversion to perform.",
 )
-def cli(input, output, conversion_type):
-    """Command Line Interface for converting TES/WES to WRROC.
+@fields_option
+@check_every_option
+def convert(  # noqa: PLR0913
+    input,
+    output,
+    output_archive,
+    include_data,
+    include_logs,
+    compression_level,
+    conversion_type,
+    fields,
+    check_every,
+):
+    """Convert a TES/WES JSON file to WRROC.
 
     Args:
         input: Path to the input JSON file.
         output: Path to the output JSON file.
+        output_archive: Path to the output zip archive.
+        include_data: Whether to add referenced local files to the archive.
+        include_logs: Whether to add referenced local log files to the archive.
+        compression_level: Deflate compression level for the archive.
         conversion_type: Type of conversion to perform. Choices are "tes-to-wrroc" and "wes-to-wrroc".
+        fields: WRROC properties to compute, or None for all of them.
+        check_every: Whether to validate the result against the profile, if not 0.
 
     Example:
         $ crategen --input data.json --output result.json --conversion-type tes-to-wrroc
+        $ crategen --input data.json --output result.json --conversion-type tes-to-wrroc --fields @id,status,startTime,endTime
+        $ crategen --input data.json --output result.json --conversion-type tes-to-wrroc --check-every 1
+        $ crategen --input data.json --output-archive crate.zip --include-data --include-logs --conversion-type tes-to-wrroc
     """
-    manager = ConverterManager()
+    _check_fields(fields, [conversion_type])
+    if not output and not output_archive:
+        output = click.prompt("Output file")
+    if include_data and not output_archive:
+        raise click.UsageError("--include-data requires --output-archive.")
+    if include_logs and not output_archive:
+        raise click.UsageError("--include-logs requires --output-archive.")
 
-    # Load input data from JSON file
-    with open(input) as input_file:
+    manager = ConverterManager(fields=fields, check_every=check_every)
+
+    # Load input data from JSON file, decompressing it if needed
+    with open_input(input) as input_file:
         data = json.load(input_file)
 
     # Perform the conversion based on the specified type
-    if conversion_type == "tes-to-wrroc":
-        result = manager.convert_tes_to_wrroc(data)
-    elif conversion_type == "wes-to-wrroc":
-        result = manager.convert_wes_to_wrroc(data)
-
-    # Save the result to the output JSON file
-    with open(output, "w") as output_file:
-        json.dump(result, output_file, indent=4)
+    result = manager.convert(conversion_type, data)
+
+    # Stream the result into a zip archive
+    if output_archive:
+        write_crate_archive(
+            result,
+            output_archive,
+            include_data=include_data,
+            compression_level=compression_level,
+            log_files=log_paths(data) if include_logs else (),
+        )
+
+    # Save the result to the output JSON file, compressing it if needed
+    if output:
+        with open_output(output) as output_file:
+            json.dump(result, output_file, indent=4)
+
+
+@cli.command()
+@click.option(
+    "--input",
+    required=True,
+    help="Path to the input NDJSON file, optionally compressed.",
+)
+@click.option(
+    "--output",
+    required=True,
+    help="Path to the output NDJSON file. Compressed if it ends in .gz, .bz2 or .xz.",
+)
+@click.option(
+    "--conversion-type",
+    required=True,
+    type=click.Choice(CONVERSION_TYPES),
+    help="Type of conversion to perform.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    help="Number of worker processes. Defaults to the number of CPUs.",
+)
+@click.option(
+    "--merge/--no-merge",
+    default=True,
+    show_default=True,
+    help="Merge the per-worker shards into the output file in input order.",
+)
+@click.option(
+    "--checkpoint/--no-checkpoint",
+    default=True,
+    show_default=True,
+    help="Journal progress so that an interrupted run can be resumed.",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Skip work recorded in the journal of an interrupted run.",
+)
+@click.option(
+    "--validate-input",
+    is_flag=True,
+    help="Validate every input record with the TES models before converting it."
+    " Only supported for tes-to-wrroc.",
+)
+@fields_option
+@check_every_option
+def ndjson(  # noqa: PLR0913
+    input,
+    output,
+    conversion_type,
+    workers,
+    merge,
+    checkpoint,
+    resume,
+    validate_input,
+    fields,
+    check_every,
+):
+    """Convert an NDJSON file with one TES/WES record per line in parallel.
+
+    Args:
+        input: Path to the input NDJSON file.
+        output: Path to the output NDJSON file.
+        conversion_type: Type of conversion to perform.
+        workers: Number of worker processes.
+        merge: Whether to merge the shards into the output file.
+        checkpoint: Whether to journal progress.
+        resume: Whether to resume an interrupted run.
+        validate_input: Whether to validate every input record.
+        fields: WRROC properties to compute, or None for all of them.
+        check_every: Validate one record out of this many per worker, or 0 for none.
+
+    Example:
+        $ crategen ndjson --input tasks.ndjson --output crates.ndjson --conversion-type tes-to-wrroc
+        $ crategen ndjson --input tasks.ndjson --output crates.ndjson --conversion-type tes-to-wrroc --check-every 1000
+    """
+    _check_fields(fields, [conversion_type])
+    count, paths = convert_ndjson(
+        input,
+        output,
+        conversion_type,
+        workers=workers,
+        merge=merge,
+        checkpoint=checkpoint,
+        resume=resume,
+        fields=fields,
+        check_every=check_every,
+        validate_input=validate_input,
+    )
+    click.echo(f"Converted {count} records into {', '.join(paths)}")
+
+
+@cli.command()
+@click.argument("inputs", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option(
+    "--output-dir", required=True, help="Directory to write the output files to."
+)
+@click.option(
+    "--conversion-type",
+    required=True,
+    type=click.Choice(CONVERSION_TYPES),
+    help="Type of conversion to perform.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    help="Number of worker processes. Defaults to the number of CPUs.",
+)
+@click.option(
+    "--compress",
+    type=click.Choice(sorted(EXTENSIONS)),
+    help="Compress the output files with the format of this extension.",
+)
+@click.option(
+    "--checkpoint/--no-checkpoint",
+    default=True,
+    show_default=True,
+    help="Journal progress so that an interrupted run can be resumed.",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Skip work recorded in the journal of an interrupted run.",
+)
+@fields_option
+@check_every_option
+def batch(  # noqa: PLR0913
+    inputs,
+    output_dir,
+    conversion_type,
+    workers,
+    compress,
+    checkpoint,
+    resume,
+    fields,
+    check_every,
+):
+    """Convert many TES/WES JSON files in parallel.
+
+    Args:
+        inputs: Paths to the input JSON files, optionally compressed.
+        output_dir: Directory to write the output files to.
+        conversion_type: Type of conversion to perform.
+        workers: Number of worker processes.
+        compress: Extension of the compression format for the output files.
+        checkpoint: Whether to journal progress.
+        resume: Whether to resume an interrupted run.
+        fields: WRROC properties to compute, or None for all of them.
+        check_every: Validate one file out of this many per worker, or 0 for none.
+
+    Example:
+        $ crategen batch tasks/*.json.gz --output-dir crates --conversion-type tes-to-wrroc --compress .gz
+    """
+    _check_fields(fields, [conversion_type])
+    paths = convert_files(
+        list(inputs),
+        output_dir,
+        conversion_type,
+        workers=workers,
+        extension=compress or "",
+        checkpoint=checkpoint,
+        resume=resume,
+        fields=fields,
+        check_every=check_every,
+    )
+    click.echo(f"Converted {len(paths)} files into {output_dir}")
+
+
+@cli.command()
+@click.argument("database")
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True))
+def index(database, paths):
+    """Add crate output files or directories to a SQLite index.
+
+    Entries of indexed files that were deleted from disk are removed. Files
+    that cannot be parsed are skipped and listed.
+
+    Args:
+        database: Path of the SQLite index database.
+        paths: Crate output files or directories to ingest.
+
+    Example:
+        $ crategen index crates.sqlite crates/
+    """
+    skipped = []
+    with CrateIndex(database) as crate_index:
+        count = sum(crate_index.add_tree(path, skipped=skipped) for path in paths)
+        removed = crate_index.prune()
+    for path, message in skipped:
+        click.echo(f"Skipped {path}: {message}", err=True)
+    click.echo(f"Indexed {count} entities into {database}")
+    if removed:
+        click.echo(f"Removed {removed} deleted files from {database}")
+    if skipped:
+        click.echo(f"Skipped {len(skipped)} unreadable files")
+
+
+@cli.command()
+@click.argument("database", type=click.Path(exists=True))
+@click.option("--id", "entity_id", help="Entity @id.")
+@click.option("--type", "entity_type", help="Entity @type.")
+@click.option("--instrument", help="Instrument, for example a container image.")
+@click.option("--url", help="URL of an input or output file.")
+@click.option("--status", help="Status, for example EXECUTOR_ERROR.")
+@click.option("--since", help="Only entities started at or after this ISO 8601 time.")
+@click.option("--until", help="Only entities started before this ISO 8601 time.")
+@click.option("--limit", type=click.IntRange(min=1), help="Maximum number of results.")
+def query(database, **criteria):
+    """Query a SQLite index of crates and print matches as NDJSON.
+
+    Args:
+        database: Path of the SQLite index database.
+        criteria: Filters passed to ``CrateIndex.query``.
+
+    Example:
+        $ crategen query crates.sqlite --status EXECUTOR_ERROR --since 2024-10-08
+    """
+    with CrateIndex(database) as crate_index:
+        for entity in crate_index.query(**criteria):
+            click.echo(json.dumps(entity))
+
+
+@cli.command()
+@click.argument("inputs", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option(
+    "--output",
+    required=True,
+    help="Path to the merged crate. Compressed if it ends in .gz, .bz2 or .xz.",
+)
+@click.option(
+    "--max-entities",
+    type=click.IntRange(min=1),
+    default=DEFAULT_MAX_ENTITIES,
+    show_default=True,
+    help="Maximum number of entities held in memory before spilling to disk.",
+)
+@click.option(
+    "--temp-dir",
+    type=click.Path(file_okay=False, exists=True),
+    help="Directory for spill files. Defaults to the system temp directory.",
+)
+def merge(inputs, output, max_entities, temp_dir):
+    """Merge many crates into one crate with entities deduplicated by @id.
+
+    Conflicting properties are resolved in favour of later inputs; list
+    properties are unioned.
+
+    Args:
+        inputs: Paths to the crates, in precedence order.
+        output: Path to the merged crate.
+        max_entities: Maximum number of entities held in memory.
+        temp_dir: Directory for spill files.
+
+    Example:
+        $ crategen merge crates/*.json --output merged.json
+    """
+    count = merge_crates(
+        list(inputs), output, max_entities=max_entities, temp_dir=temp_dir
+    )
+    click.echo(f"Merged {count} entities into {output}")
+
+
+@cli.command()
+@click.argument(
+    "inputs", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option(
+    "--every",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Validate one record out of this many.",
+)
+@click.option(
+    "--fields",
+    callback=_parse_fields,
+    help="Comma-separated WRROC properties the output was generated with. Defaults to all.",
+)
+@click.option(
+    "--assume-type",
+    help="@type of records that declare none, e.g. CreateAction for flat converter"
+    " output. By default a missing @type is reported.",
+)
+def check(inputs, every, fields, assume_type):
+    """Validate WRROC output files against the Workflow Run RO-Crate profile.
+
+    Every line of an NDJSON file is one record; other files are a single
+    record. Violations are printed and the command exits with status 1 if any
+    checked record is invalid.
+
+    Args:
+        inputs: Paths to the WRROC output files, optionally compressed.
+        every: Validate one record out of this many.
+        fields: WRROC properties the output was generated with, or None for all of them.
+        assume_type: The @type of records without one, or None to report it as missing.
+
+    Example:
+        $ crategen check crates.ndjson --every 100 --assume-type CreateAction
+    """
+    _check_fields(fields, CONVERSION_TYPES)
+    validator = ProfileValidator(every=every, fields=fields, assume_type=assume_type)
+    records = checked = invalid = 0
+    for path in inputs:
+        for line_number, record in iter_records(path):
+            records += 1
+            if isinstance(record, ValidationIssue):
+                issues = [record]
+            else:
+                issues = validator.sample(record)
+            if issues is None:
+                continue
+            checked += 1
+            invalid += bool(issues)
+            for issue in issues:
+                click.echo(f"{path}:{line_number}: {issue}")
+    click.echo(f"Checked {checked} of {records} records, {invalid} invalid")
+    if invalid:
+        raise click.exceptions.Exit(1)
+
+
+@cli.command()
+@click.option("--host", default="127.0.0.1", show_default=True, help="Host to bind.")
+@click.option("--port", default=8000, show_default=True, help="Port to bind.")
+@click.option(
+    "--socket",
+    "socket_path",
+    help="Path of a Unix domain socket to listen on instead of TCP.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    help="Maximum number of request threads converting at once. Conversions"
+    " share one interpreter, so this caps concurrency rather than adding CPU"
+    " parallelism. Defaults to the number of CPUs.",
+)
+@fields_option
+@check_every_option
+def serve(host, port, socket_path, workers, fields, check_every):  # noqa: PLR0913
+    """Run a local conversion server.
+
+    Args:
+        host: Host to bind when serving over TCP.
+        port: Port to bind when serving over TCP.
+        socket_path: Path of a Unix domain socket to listen on.
+        workers: Maximum number of concurrent conversions.
+        fields: WRROC properties to compute, or None for all of them.
+        check_every: Validate one converted record out of this many, or 0 for none.
+
+    Example:
+        $ crategen serve --port 8000
+        $ curl -d @task.json http://127.0.0.1:8000/tes-to-wrroc
+    """
+    _check_fields(fields, CONVERSION_TYPES)
+    server = create_server(
+        host=host,
+        port=port,
+        socket_path=socket_path,
+        workers=workers,
+        fields=fields,
+        check_every=check_every,
+    )
+    address = socket_path or f"http://{host}:{server.server_address[1]}"
+    click.echo(f"Serving conversions on {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,117 @@
+"""Transparent gzip, bz2 and lzma handling for input and output files.
+
+Compressed inputs are detected from their magic bytes and compressed outputs
+from their file extension. Both are streamed, so no temporary files are needed.
+"""
+
+import bz2
+import gzip
+import lzma
+import os
+
+GZIP = "gzip"
+BZ2 = "bz2"
+LZMA = "lzma"
+
+_MAGIC_NUMBERS = (
+    (b"\x1f\x8b", GZIP),
+    (b"BZh", BZ2),
+    (b"\xfd7zXZ\x00", LZMA),
+)
+_MAGIC_LENGTH = max(len(magic) for magic, _ in _MAGIC_NUMBERS)
+
+JSON_EXTENSIONS = (".json",)
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+EXTENSIONS = {
+    ".gz": GZIP,
+    ".gzip": GZIP,
+    ".bz2": BZ2,
+    ".xz": LZMA,
+    ".lzma": LZMA,
+}
+
+_OPENERS = {
+    GZIP: gzip.open,
+    BZ2: bz2.open,
+    LZMA: lzma.open,
+}
+
+# Errors raised while reading a corrupt or truncated, possibly compressed file.
+READ_ERRORS = (OSError, EOFError, lzma.LZMAError)
+
+
+def compression_from_extension(path):
+    """Return the compression format implied by a file extension.
+
+    Args:
+        path: The file path.
+
+    Returns:
+        str: The compression format, or None for uncompressed files.
+    """
+    return EXTENSIONS.get(os.path.splitext(os.fspath(path))[1].lower())
+
+
+def detect_compression(path):
+    """Detect the compression format of a file from its magic bytes.
+
+    Args:
+        path: The file path.
+
+    Returns:
+        str: The compression format, or None for uncompressed files.
+    """
+    with open(path, "rb") as file:
+        header = file.read(_MAGIC_LENGTH)
+    for magic, compression in _MAGIC_NUMBERS:
+        if header.startswith(magic):
+            return compression
+    return None
+
+
+def strip_compression_extension(path):
+    """Remove a compression extension from a path, if there is one.
+
+    Args:
+        path: The file path.
+
+    Returns:
+        str: The path without its compression extension.
+    """
+    path = os.fspath(path)
+    if compression_from_extension(path):
+        return os.path.splitext(path)[0]
+    return path
+
+
+def open_input(path, mode="rt"):
+    """Open a possibly compressed file for reading.
+
+    Args:
+        path: The file path.
+        mode: The file mode, "rt" or "rb".
+
+    Returns:
+        A file object yielding the decompressed content.
+    """
+    opener = _OPENERS.get(detect_compression(path), open)
+    if "b" in mode:
+        return opener(path, mode)
+    return opener(path, mode, encoding="utf-8")
+
+
+def open_output(path, mode="wt"):
+    """Open a file for writing, compressing it if its extension asks for it.
+
+    Args:
+        path: The file path.
+        mode: The file mode, "wt" or "wb".
+
+    Returns:
+        A file object compressing the written content as needed.
+    """
+    opener = _OPENERS.get(compression_from_extension(path), open)
+    if "b" in mode:
+        return opener(path, mode)
+    return opener(path, mode, encoding="utf-8")
@@ -1,7 +1,17 @@
 """Manager for handling TES and WES to WRROC conversions."""
 
+from .converters import tes_converter, wes_converter
 from .converters.tes_converter import TESConverter
 from .converters.wes_converter import WESConverter
+from .validation import CREATE_ACTION_TYPE, ProfileValidator
+
+CONVERSION_TYPES = ("tes-to-wrroc", "wes-to-wrroc")
+
+# WRROC properties each conversion type can compute, in output order.
+SUPPORTED_FIELDS = {
+    "tes-to-wrroc": tuple(tes_converter.WRROC_FIELDS),
+    "wes-to-wrroc": tuple(wes_converter.WRROC_FIELDS),
+}
 
 
 class ConverterManager:
@@ -10,12 +20,53 @@ class ConverterManager:
     Attributes:
         tes_converter: An instance of TESConverter for TES data conversions.
         wes_converter: An instance of WESConverter for WES data conversions.
+        fields: WRROC properties to compute, or None for all of them.
+        validator: Profile validator applied to the converted data, or None.
     """
 
-    def __init__(self):
-        """Initializes the converters for TES and WES."""
+    def __init__(self, fields=None, check_every=None):
+        """Initializes the converters for TES and WES.
+
+        Args:
+            fields: WRROC properties to compute, for example ``("@id", "status")``.
+                Unrequested properties are skipped entirely. All properties are
+                computed if None.
+            check_every: Validate one converted record out of this many against
+                the Workflow Run RO-Crate profile as a ``CreateAction``. No
+                validation if None or 0.
+        """
         self.tes_converter = TESConverter()
         self.wes_converter = WESConverter()
+        self.fields = None if fields is None else tuple(fields)
+        self.validator = (
+            ProfileValidator(
+                every=check_every,
+                fields=self.fields,
+                assume_type=CREATE_ACTION_TYPE,
+            )
+            if check_every
+            else None
+        )
+
+    def convert(self, conversion_type, data):
+        """Converts data according to the given conversion type.
+
+        Args:
+            conversion_type: Type of conversion to perform. Choices are "tes-to-wrroc" and "wes-to-wrroc".
+            data: The TES or WES data to be converted.
+
+        Returns:
+            The converted data in WRROC format.
+
+        Raises:
+            ValueError: If the conversion type is not supported.
+            WRROCValidationError: If the converted data is validated and violates the profile.
+        """
+        if conversion_type == "tes-to-wrroc":
+            return self.convert_tes_to_wrroc(data)
+        if conversion_type == "wes-to-wrroc":
+            return self.convert_wes_to_wrroc(data)
+        raise ValueError(f"Unsupported conversion type: '{conversion_type}'")
 
     def convert_tes_to_wrroc(self, tes_data):
         """Converts TES data to WRROC format.
@@ -26,7 +77,9 @@ class ConverterManager:
         Returns:
             The converted data in WRROC format.
         """
-        return self.tes_converter.convert_to_wrroc(tes_data)
+        return self._validated(
+            self.tes_converter.convert_to_wrroc(tes_data, fields=self.fields)
+        )
 
     def convert_wes_to_wrroc(self, wes_data):
         """Converts WES data to WRROC format.
@@ -37,4 +90,11 @@ class ConverterManager:
         Returns:
             The converted data in WRROC format.
         """
-        return self.wes_converter.convert_to_wrroc(wes_data)
+        return self._validated(
+            self.wes_converter.convert_to_wrroc(wes_data, fields=self.fields)
+        )
+
+    def _validated(self, wrroc_data):
+        if self.validator is not None:
+            self.validator.check(wrroc_data)
+        return wrroc_data
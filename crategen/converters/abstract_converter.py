@@ -7,11 +7,12 @@ class AbstractConverter(ABC):
     """Abstract converter for TES/WES to WRROC and vice versa."""
 
     @abstractmethod
-    def convert_to_wrroc(self, data):
+    def convert_to_wrroc(self, data, fields=None):
         """Convert data to WRROC format.
 
         Args:
             data: The data to be converted.
+            fields: WRROC properties to compute. All properties are computed if None.
 
         Returns:
             The data converted to WRROC format.
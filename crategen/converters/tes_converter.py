@@ -1,41 +1,67 @@
 """Module for converting TES data to WRROC format and vice versa."""
 
 from .abstract_converter import AbstractConverter
-from .utils import convert_to_iso8601
+from .utils import convert_to_iso8601, select_fields
+
+
+def _instrument(tes_data):
+    executors = tes_data.get("executors", [{}])
+    return executors[0].get("image", None) if executors else None
+
+
+def _start_time(tes_data):
+    return convert_to_iso8601(tes_data.get("creation_time", ""))
+
+
+def _end_time(tes_data):
+    return convert_to_iso8601(tes_data.get("logs", [{}])[0].get("end_time", ""))
+
+
+# Builders of each WRROC property, in output order. Only the builders of
+# requested fields run, so unrequested subtrees of the TES data are never read.
+WRROC_FIELDS = {
+    "@id": lambda tes_data: tes_data.get("id", ""),
+    "name": lambda tes_data: tes_data.get("name", ""),
+    "description": lambda tes_data: tes_data.get("description", ""),
+    "instrument": _instrument,
+    "status": lambda tes_data: tes_data.get("state", ""),
+    "object": lambda tes_data: [
+        {"@id": input.get("url", ""), "name": input.get("path", "")}
+        for input in tes_data.get("inputs", [])
+    ],
+    "result": lambda tes_data: [
+        {"@id": output.get("url", ""), "name": output.get("path", "")}
+        for output in tes_data.get("outputs", [])
+    ],
+    "startTime": _start_time,
+    "endTime": _end_time,
+}
+
+
+# TES record collections read by each WRROC property. Properties not listed
+# only read top-level values and executors.
+FIELD_COLLECTIONS = {
+    "object": "inputs",
+    "result": "outputs",
+    "endTime": "logs",
+}
 
 
 class TESConverter(AbstractConverter):
     """Converter for TES data to WRROC and vice versa."""
 
-    def convert_to_wrroc(self, tes_data):
+    def convert_to_wrroc(self, tes_data, fields=None):
         """Convert TES data to WRROC format.
 
         Args:
             tes_data: The input TES data.
+            fields: WRROC properties to compute. All properties are computed if None.
 
         Returns:
             dict: The converted WRROC data.
         """
-        id = tes_data.get("id", "")
-        name = tes_data.get("name", "")
-        description = tes_data.get("description", "")
-        executors = tes_data.get("executors", [{}])
-        inputs = tes_data.get("inputs", [])
-        outputs = tes_data.get("outputs", [])
-        creation_time = tes_data.get("creation_time", "")
-        end_time = tes_data.get("logs", [{}])[0].get("end_time", "")
-
-        wrroc_data = {
-            "@id": id,
-            "name": name,
-            "description": description,
-            "instrument": executors[0].get("image", None) if executors else None,
-            "object": [{"@id": input.get("url", ""), "name": input.get("path", "")} for input in inputs],
-            "result": [{"@id": output.get("url", ""), "name": output.get("path", "")} for output in outputs],
-            "startTime": convert_to_iso8601(creation_time),
-            "endTime": convert_to_iso8601(end_time),
-        }
-        return wrroc_data
+        builders = select_fields(WRROC_FIELDS, fields)
+        return {field: build(tes_data) for field, build in builders.items()}
 
     def convert_from_wrroc(self, wrroc_data):
         """Convert WRROC data to TES format.
@@ -50,6 +76,7 @@ class TESConverter(AbstractConverter):
         name = wrroc_data.get("name", "")
         description = wrroc_data.get("description", "")
         instrument = wrroc_data.get("instrument", "")
+        state = wrroc_data.get("status", "")
         object_data = wrroc_data.get("object", [])
         result_data = wrroc_data.get("result", [])
         start_time = wrroc_data.get("startTime", "")
@@ -59,6 +86,7 @@ class TESConverter(AbstractConverter):
             "id": id,
             "name": name,
             "description": description,
+            "state": state,
             "executors": [{"image": instrument}],
             "inputs": [{"url": obj.get("@id", ""), "path": obj.get("name", "")} for obj in object_data],
             "outputs": [{"url": res.get("@id", ""), "path": res.get("name", "")} for res in result_data],
@@ -7,6 +7,7 @@ def convert_to_iso8601(timestamp):
     """Convert a given timestamp to ISO 8601 format.
 
     Handles multiple formats including RFC 3339, ISO 8601 with and without fractional seconds.
+    Timestamps with a UTC offset are converted to UTC.
 
     Args:
         timestamp (str): The timestamp to be converted.
@@ -23,8 +24,36 @@ def convert_to_iso8601(timestamp):
         ]
         for fmt in formats:
             try:
-                return datetime.datetime.strptime(timestamp, fmt).isoformat("T") + "Z"
+                parsed = datetime.datetime.strptime(timestamp, fmt)
             except ValueError:
                 continue
+            if parsed.tzinfo is not None:
+                parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+            return parsed.isoformat("T") + "Z"
         return None
     return None
+
+
+def select_fields(builders, fields):
+    """Select the property builders of the requested WRROC fields.
+
+    Args:
+        builders (dict): Builders of all supported WRROC properties, in output order.
+        fields (Iterable[str]): The requested properties, or None for all of them.
+
+    Returns:
+        dict: The builders of the requested properties, in output order.
+
+    Raises:
+        ValueError: If a requested property is not supported.
+    """
+    if fields is None:
+        return builders
+    fields = set(fields)
+    unknown = fields - builders.keys()
+    if unknown:
+        raise ValueError(
+            f"Unsupported WRROC fields: {', '.join(sorted(unknown))}. "
+            f"Supported fields are: {', '.join(builders)}"
+        )
+    return {field: build for field, build in builders.items() if field in fields}
@@ -1,37 +1,47 @@
 """Module for converting WES data to WRROC format and vice versa."""
 
 from .abstract_converter import AbstractConverter
-from .utils import convert_to_iso8601
+from .utils import convert_to_iso8601, select_fields
+
+
+def _start_time(wes_data):
+    return convert_to_iso8601(wes_data.get("run_log", {}).get("start_time", ""))
+
+
+def _end_time(wes_data):
+    return convert_to_iso8601(wes_data.get("run_log", {}).get("end_time", ""))
+
+
+# Builders of each WRROC property, in output order.
+WRROC_FIELDS = {
+    "@id": lambda wes_data: wes_data.get("run_id", ""),
+    "name": lambda wes_data: wes_data.get("run_log", {}).get("name", ""),
+    "instrument": lambda wes_data: wes_data.get("request", {}).get("workflow_url"),
+    "status": lambda wes_data: wes_data.get("state", ""),
+    "startTime": _start_time,
+    "endTime": _end_time,
+    "result": lambda wes_data: [
+        {"@id": output.get("location", ""), "name": output.get("name", "")}
+        for output in wes_data.get("outputs", {})
+    ],
+}
 
 
 class WESConverter(AbstractConverter):
     """Converter for WES data to WRROC and vice versa."""
 
-    def convert_to_wrroc(self, wes_data):
+    def convert_to_wrroc(self, wes_data, fields=None):
         """Convert WES data to WRROC format.
 
         Args:
             wes_data: The input WES data.
+            fields: WRROC properties to compute. All properties are computed if None.
 
         Returns:
             dict: The converted WRROC data.
         """
-        run_id = wes_data.get("run_id", "")
-        name = wes_data.get("run_log", {}).get("name", "")
-        state = wes_data.get("state", "")
-        start_time = wes_data.get("run_log", {}).get("start_time", "")
-        end_time = wes_data.get("run_log", {}).get("end_time", "")
-        outputs = wes_data.get("outputs", {})
-
-        wrroc_data = {
-            "@id": run_id,
-            "name": name,
-            "status": state,
-            "startTime": convert_to_iso8601(start_time),
-            "endTime": convert_to_iso8601(end_time),
-            "result": [{"@id": output.get("location", ""), "name": output.get("name", "")} for output in outputs],
-        }
-        return wrroc_data
+        builders = select_fields(WRROC_FIELDS, fields)
+        return {field: build(wes_data) for field, build in builders.items()}
 
     def convert_from_wrroc(self, wrroc_data):
         """Convert WRROC data to WES format.
@@ -47,6 +57,7 @@ class WESConverter(AbstractConverter):
         start_time = wrroc_data.get("startTime", "")
         end_time = wrroc_data.get("endTime", "")
         state = wrroc_data.get("status", "")
+        workflow_url = wrroc_data.get("instrument")
         result_data = wrroc_data.get("result", [])
 
         wes_data = {
@@ -57,6 +68,7 @@ class WESConverter(AbstractConverter):
                 "end_time": end_time,
             },
             "state": state,
+            "request": {"workflow_url": workflow_url},
             "outputs": [{"location": res.get("@id", ""), "name": res.get("name", "")} for res in result_data],
         }
         return wes_data
@@ -0,0 +1,442 @@
+"""Persistent SQLite index over generated WRROC crates.
+
+The index stores one row per entity with its identifier, status and time
+range, plus its types, instruments and the URLs of its ``object`` and
+``result`` files in join tables. Identifiers are stored as strings; values
+that are neither a string, a number nor an ``{"@id": ...}`` reference are
+skipped.
+Lookups such as "which runs used image X" then use B-tree indexes instead of
+re-reading every crate.
+
+Start and end times are also stored as UTC epoch seconds, so time range
+queries compare instants rather than strings with different UTC offsets.
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+
+from .compression import (
+    JSON_EXTENSIONS,
+    NDJSON_EXTENSIONS,
+    READ_ERRORS,
+    open_input,
+    strip_compression_extension,
+)
+
+# Bumped whenever the schema changes. The index only caches crate files, so
+# an index with another schema version is dropped and has to be rebuilt.
+SCHEMA_VERSION = 3
+
+_DROP_SCHEMA = """
+DROP TABLE IF EXISTS files;
+DROP TABLE IF EXISTS instruments;
+DROP TABLE IF EXISTS entity_types;
+DROP TABLE IF EXISTS entities;
+DROP TABLE IF EXISTS sources;
+"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entities (
+    rowid INTEGER PRIMARY KEY,
+    source TEXT NOT NULL REFERENCES sources(path) ON DELETE CASCADE,
+    entity_id TEXT NOT NULL,
+    status TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    start_epoch REAL,
+    end_epoch REAL
+);
+CREATE TABLE IF NOT EXISTS entity_types (
+    entity_rowid INTEGER NOT NULL REFERENCES entities(rowid) ON DELETE CASCADE,
+    type TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS instruments (
+    entity_rowid INTEGER NOT NULL REFERENCES entities(rowid) ON DELETE CASCADE,
+    instrument TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    entity_rowid INTEGER NOT NULL REFERENCES entities(rowid) ON DELETE CASCADE,
+    url TEXT NOT NULL,
+    role TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entities_source ON entities(source);
+CREATE INDEX IF NOT EXISTS entities_entity_id ON entities(entity_id);
+CREATE INDEX IF NOT EXISTS entities_status_start ON entities(status, start_epoch);
+CREATE INDEX IF NOT EXISTS entities_start_epoch ON entities(start_epoch);
+CREATE INDEX IF NOT EXISTS entity_types_type ON entity_types(type, entity_rowid);
+CREATE INDEX IF NOT EXISTS entity_types_entity ON entity_types(entity_rowid);
+CREATE INDEX IF NOT EXISTS instruments_instrument
+    ON instruments(instrument, entity_rowid);
+CREATE INDEX IF NOT EXISTS instruments_entity ON instruments(entity_rowid);
+CREATE INDEX IF NOT EXISTS files_url ON files(url, entity_rowid);
+CREATE INDEX IF NOT EXISTS files_entity ON files(entity_rowid);
+"""
+
+_FILE_ROLES = ("object", "result")
+
+
+def iter_crate_entities(path):
+    """Yield the entities of a crate output file.
+
+    Supports single WRROC objects, lists of them, RO-Crate documents with an
+    ``@graph`` and NDJSON files with one object per line, optionally compressed.
+
+    Args:
+        path: Path to the crate output file.
+
+    Yields:
+        dict: The entities contained in the file.
+    """
+    with open_input(path) as file:
+        if strip_compression_extension(path).endswith(NDJSON_EXTENSIONS):
+            for line in file:
+                if line.strip():
+                    yield from _entities(json.loads(line))
+        else:
+            yield from _entities(json.load(file))
+
+
+def _entities(data):
+    if isinstance(data, list):
+        for item in data:
+            yield from _entities(item)
+    elif isinstance(data, dict):
+        if "@graph" in data:
+            yield from (entity for entity in data["@graph"] if isinstance(entity, dict))
+        else:
+            yield data
+
+
+def to_epoch(timestamp):
+    """Convert an ISO 8601 timestamp to UTC epoch seconds.
+
+    Timestamps without a UTC offset, including plain dates, are taken as UTC.
+    A trailing "Z" after an explicit offset, as in "...+00:00Z", is ignored.
+
+    Args:
+        timestamp (str): The timestamp.
+
+    Returns:
+        float: The epoch seconds, or None if ``timestamp`` is not a valid ISO 8601 time.
+    """
+    if not isinstance(timestamp, str) or not timestamp:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(timestamp.removesuffix("Z"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.timestamp()
+
+
+def _query_epoch(name, timestamp):
+    epoch = to_epoch(timestamp)
+    if epoch is None:
+        raise ValueError(f"'{name}' must be an ISO 8601 time, got {timestamp!r}")
+    return epoch
+
+
+def _reference(value):
+    """Return a string, number or ``{"@id": ...}`` reference as a string, or None."""
+    if isinstance(value, dict):
+        value = value.get("@id")
+    if isinstance(value, str):
+        return value or None
+    if isinstance(value, int | float) and not isinstance(value, bool):
+        return str(value)
+    return None
+
+
+def _references(value):
+    references = (_reference(item) for item in _as_list(value))
+    return list(dict.fromkeys(reference for reference in references if reference))
+
+
+def _text(value):
+    return value if isinstance(value, str) else None
+
+
+def _single(values):
+    if not values:
+        return None
+    return values[0] if len(values) == 1 else values
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+class CrateIndex:
+    """SQLite index over generated crates.
+
+    Attributes:
+        path: Path of the SQLite database.
+    """
+
+    def __init__(self, path):
+        """Opens or creates the index database.
+
+        Args:
+            path: Path of the SQLite database.
+        """
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        (version,) = self._connection.execute("PRAGMA user_version").fetchone()
+        if version != SCHEMA_VERSION:
+            self._connection.executescript(_DROP_SCHEMA)
+            self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Closes the database connection."""
+        self._connection.close()
+
+    def add(self, path):
+        """Ingests a crate output file, replacing earlier entries of the same file.
+
+        Files whose size and modification time did not change since they were
+        last ingested are skipped.
+
+        Args:
+            path: Path to the crate output file.
+
+        Returns:
+            int: The number of indexed entities, or 0 if the file was unchanged.
+        """
+        source = os.path.abspath(path)
+        stat = os.stat(source)
+        previous = self._connection.execute(
+            "SELECT mtime_ns, size FROM sources WHERE path = ?", (source,)
+        ).fetchone()
+        if previous and tuple(previous) == (stat.st_mtime_ns, stat.st_size):
+            return 0
+
+        count = 0
+        with self._connection:
+            self._connection.execute("DELETE FROM sources WHERE path = ?", (source,))
+            self._connection.execute(
+                "INSERT INTO sources (path, mtime_ns, size) VALUES (?, ?, ?)",
+                (source, stat.st_mtime_ns, stat.st_size),
+            )
+            for entity in iter_crate_entities(source):
+                entity_id = _reference(entity.get("@id"))
+                if entity_id is None:
+                    continue
+                self._insert_entity(source, entity_id, entity)
+                count += 1
+        return count
+
+    def add_tree(self, path, skipped=None):
+        """Ingests a crate output file or every JSON and NDJSON file below a directory.
+
+        Entries of files below the directory that no longer exist are removed.
+
+        Args:
+            path: Path to a crate output file or a directory.
+            skipped: A list that receives a ``(path, message)`` tuple for every
+                file that cannot be read or parsed. Such a file is skipped and
+                keeps its earlier entries. If None, the error is raised.
+
+        Returns:
+            int: The number of indexed entities.
+        """
+        if not os.path.isdir(path):
+            return self._add_or_skip(path, skipped)
+        self.prune(path)
+        count = 0
+        for directory, _, file_names in os.walk(path):
+            for file_name in sorted(file_names):
+                if strip_compression_extension(file_name).endswith(
+                    JSON_EXTENSIONS + NDJSON_EXTENSIONS
+                ):
+                    count += self._add_or_skip(
+                        os.path.join(directory, file_name), skipped
+                    )
+        return count
+
+    def _add_or_skip(self, path, skipped):
+        if skipped is None:
+            return self.add(path)
+        try:
+            return self.add(path)
+        except (ValueError, *READ_ERRORS) as exc:
+            skipped.append((path, str(exc)))
+            return 0
+
+    def prune(self, directory=None):
+        """Removes the entries of indexed files that no longer exist.
+
+        Args:
+            directory: Only prune files below this directory. Defaults to all files.
+
+        Returns:
+            int: The number of removed files.
+        """
+        prefix = (
+            "" if directory is None else os.path.join(os.path.abspath(directory), "")
+        )
+        missing = [
+            (path,)
+            for (path,) in self._connection.execute("SELECT path FROM sources")
+            if path.startswith(prefix) and not os.path.exists(path)
+        ]
+        with self._connection:
+            self._connection.executemany("DELETE FROM sources WHERE path = ?", missing)
+        return len(missing)
+
+    def _insert_entity(self, source, entity_id, entity):
+        start_time = _text(entity.get("startTime"))
+        end_time = _text(entity.get("endTime"))
+        cursor = self._connection.execute(
+            "INSERT INTO entities (source, entity_id, status,"
+            " start_time, end_time, start_epoch, end_epoch)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                source,
+                entity_id,
+                _reference(entity.get("status") or entity.get("actionStatus")),
+                start_time,
+                end_time,
+                to_epoch(start_time),
+                to_epoch(end_time),
+            ),
+        )
+        rowid = cursor.lastrowid
+        self._connection.executemany(
+            "INSERT INTO entity_types (entity_rowid, type) VALUES (?, ?)",
+            [(rowid, entity_type) for entity_type in _references(entity.get("@type"))],
+        )
+        self._connection.executemany(
+            "INSERT INTO instruments (entity_rowid, instrument) VALUES (?, ?)",
+            [
+                (rowid, instrument)
+                for instrument in _references(entity.get("instrument"))
+            ],
+        )
+        self._connection.executemany(
+            "INSERT INTO files (entity_rowid, url, role) VALUES (?, ?, ?)",
+            [
+                (rowid, url, role)
+                for role in _FILE_ROLES
+                for url in _references(entity.get(role))
+            ],
+        )
+
+    def query(  # noqa: PLR0913
+        self,
+        entity_id=None,
+        entity_type=None,
+        instrument=None,
+        url=None,
+        status=None,
+        since=None,
+        until=None,
+        limit=None,
+    ):
+        """Finds indexed entities matching all given criteria.
+
+        Args:
+            entity_id: The entity ``@id``.
+            entity_type: One of the entity's ``@type`` values.
+            instrument: One of the entity's instruments, for example a container image.
+            url: The URL of one of the entity's ``object`` or ``result`` files.
+            status: The entity status, for example "EXECUTOR_ERROR".
+            since: Only entities started at or after this ISO 8601 time.
+            until: Only entities started before this ISO 8601 time.
+            limit: Maximum number of results.
+
+        Returns:
+            list: The matching entities as dicts, ordered by start time.
+
+        Raises:
+            ValueError: If ``since`` or ``until`` is not an ISO 8601 time.
+        """
+        clauses = []
+        params = []
+        for column, value in (
+            ("e.entity_id", entity_id),
+            ("e.status", status),
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")  # nosec B608
+                params.append(value)
+        if since is not None:
+            clauses.append("e.start_epoch >= ?")
+            params.append(_query_epoch("since", since))
+        if until is not None:
+            clauses.append("e.start_epoch < ?")
+            params.append(_query_epoch("until", until))
+        if entity_type is not None:
+            clauses.append(
+                "e.rowid IN (SELECT entity_rowid FROM entity_types WHERE type = ?)"
+            )
+            params.append(entity_type)
+        if instrument is not None:
+            clauses.append(
+                "e.rowid IN"
+                " (SELECT entity_rowid FROM instruments WHERE instrument = ?)"
+            )
+            params.append(instrument)
+        if url is not None:
+            clauses.append("e.rowid IN (SELECT entity_rowid FROM files WHERE url = ?)")
+            params.append(url)
+
+        sql = (
+            "SELECT e.rowid, e.source, e.entity_id, e.status,"
+            " e.start_time, e.end_time FROM entities e"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY e.start_epoch, e.rowid"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        rows = self._connection.execute(sql, params).fetchall()
+        rowids = [row["rowid"] for row in rows]
+        types = self._values("entity_types", "type", rowids)
+        instruments = self._values("instruments", "instrument", rowids)
+        return [
+            {
+                "@id": row["entity_id"],
+                "@type": types.get(row["rowid"], []),
+                "instrument": _single(instruments.get(row["rowid"], [])),
+                "status": row["status"],
+                "startTime": row["start_time"],
+                "endTime": row["end_time"],
+                "source": row["source"],
+            }
+            for row in rows
+        ]
+
+    def _values(self, table, column, rowids):
+        values = {}
+        for start in range(0, len(rowids), 500):
+            chunk = rowids[start : start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            for rowid, value in self._connection.execute(
+                f"SELECT entity_rowid, {column} FROM {table} WHERE entity_rowid IN ({placeholders})",  # nosec B608
+                chunk,
+            ):
+                values.setdefault(rowid, []).append(value)
+        return values
@@ -0,0 +1,297 @@
+"""External-memory merge of many crates into one deduplicated crate.
+
+Entities are read from the input crates in bounded batches, sorted by
+``@id`` and spilled to temporary run files. The runs are then merged with a
+k-way merge, entities sharing an ``@id`` are combined, and the merged
+``@graph`` is written as a stream. Memory use is bounded by the batch size and
+the number of runs merged at once, not by the total size of the crates.
+
+The merged crate gets an RO-Crate metadata descriptor and a root data entity
+whose ``hasPart`` lists every merged entity. Descriptors and root entities of
+the inputs are merged into these two entities. The ``hasPart`` references of
+the input roots are spilled as separate records and deduplicated by the same
+sort, so they are never unioned in memory.
+
+Conflicting properties are resolved deterministically:
+
+- List values, and ``@type``, are unioned in first-seen order without duplicates.
+- Otherwise the value from the later input, in the order the inputs are
+  given, wins. Within one input, the later entity wins.
+- Empty values (``None``, ``""``, ``[]``, ``{}``) never replace non-empty ones.
+"""
+
+import heapq
+import itertools
+import json
+import os
+import tempfile
+
+from .compression import open_output
+from .index import iter_crate_entities
+from .rocrate import (
+    METADATA_DESCRIPTOR_ID,
+    RO_CRATE_CONTEXT,
+    ROOT_ENTITY_ID,
+    metadata_descriptor,
+    root_data_entity,
+)
+
+DEFAULT_MAX_ENTITIES = 100_000
+DEFAULT_MAX_OPEN_RUNS = 64
+
+
+def _sort_key(record):
+    return record[0], record[1], record[2]
+
+
+def _write_run(records, spill_dir):
+    """Write sorted records to a new run file and return its path."""
+    fd, path = tempfile.mkstemp(suffix=".run", dir=spill_dir)
+    with os.fdopen(fd, "w", encoding="utf-8") as run:
+        for record in records:
+            run.write(json.dumps(record, separators=(",", ":")))
+            run.write("\n")
+    return path
+
+
+def _read_run(path):
+    with open(path, encoding="utf-8") as run:
+        for line in run:
+            yield json.loads(line)
+
+
+def _root_parts(entity):
+    """Split the ``hasPart`` references off a root entity."""
+    parts = entity.get("hasPart")
+    properties = {key: value for key, value in entity.items() if key != "hasPart"}
+    references = []
+    for part in _as_list(parts) if parts else ():
+        part_id = part.get("@id") if isinstance(part, dict) else part
+        if isinstance(part_id, str) and part_id:
+            references.append(part_id)
+    return properties, references
+
+
+def _spill_runs(input_paths, spill_dir, max_entities, split_root_parts=False):
+    """Read all entities in batches and spill each batch as a sorted run.
+
+    With ``split_root_parts``, every ``hasPart`` reference of a root entity is
+    spilled as a record of the referenced ``@id`` with no entity, and the root
+    entity is spilled without ``hasPart``.
+    """
+    runs = []
+    batch = []
+    for input_index, path in enumerate(input_paths):
+        for position, entity in enumerate(iter_crate_entities(path)):
+            entity_id = entity.get("@id")
+            if entity_id is None:
+                continue
+            records = [[str(entity_id), input_index, position, entity]]
+            if split_root_parts and entity_id == ROOT_ENTITY_ID:
+                properties, references = _root_parts(entity)
+                records = [[ROOT_ENTITY_ID, input_index, position, properties]]
+                records.extend(
+                    [part_id, input_index, position, None] for part_id in references
+                )
+            for record in records:
+                batch.append(record)
+                if len(batch) >= max_entities:
+                    batch.sort(key=_sort_key)
+                    runs.append(_write_run(batch, spill_dir))
+                    batch = []
+    if batch:
+        batch.sort(key=_sort_key)
+        runs.append(_write_run(batch, spill_dir))
+    return runs
+
+
+def _reduce_runs(runs, spill_dir, max_open_runs):
+    """Merge runs in groups until at most ``max_open_runs`` remain."""
+    while len(runs) > max_open_runs:
+        merged = []
+        for start in range(0, len(runs), max_open_runs):
+            group = runs[start : start + max_open_runs]
+            records = heapq.merge(*(_read_run(run) for run in group), key=_sort_key)
+            merged.append(_write_run(records, spill_dir))
+            for run in group:
+                os.remove(run)
+        runs = merged
+    return runs
+
+
+def _is_empty(value):
+    return value is None or (isinstance(value, str | list | dict) and not value)
+
+
+def _as_list(value):
+    return value if isinstance(value, list) else [value]
+
+
+def _value_key(value):
+    return json.dumps(value, sort_keys=True)
+
+
+def _union_into(merged, key, value, unions):
+    """Union ``value`` into ``merged[key]``.
+
+    ``unions`` maps each unioned property to its list and the keys of the values
+    in it, so values already merged are not serialized again.
+    """
+    if key not in unions:
+        values = list(_as_list(merged[key]))
+        unions[key] = values, {_value_key(item) for item in values}
+    values, seen = unions[key]
+    for item in _as_list(value):
+        item_key = _value_key(item)
+        if item_key not in seen:
+            seen.add(item_key)
+            values.append(item)
+    merged[key] = values[0] if key == "@type" and len(values) == 1 else values
+
+
+def _merge_into(merged, other, unions):
+    """Merge ``other`` into ``merged`` in place."""
+    for key, value in other.items():
+        if key not in merged or _is_empty(merged[key]):
+            merged[key] = value
+            unions.pop(key, None)
+        elif _is_empty(value) or value == merged[key]:
+            continue
+        elif key == "@type" or isinstance(value, list) or isinstance(merged[key], list):
+            _union_into(merged, key, value, unions)
+        else:
+            merged[key] = value
+
+
+def merge_entities(current, other):
+    """Merge two entities with the same ``@id``.
+
+    Args:
+        current: The entity merged so far.
+        other: An entity from a later input or later position.
+
+    Returns:
+        dict: The merged entity.
+    """
+    merged = dict(current)
+    _merge_into(merged, other, {})
+    return merged
+
+
+def _merge_group(entities):
+    """Merge all entities sharing an ``@id``, or return None if there are none."""
+    merged = None
+    unions = {}
+    for entity in entities:
+        if merged is None:
+            merged = dict(entity)
+        else:
+            _merge_into(merged, entity, unions)
+    return merged
+
+
+def _iter_groups(input_paths, max_entities, max_open_runs, temp_dir, split_root_parts):
+    """Yield each ``@id`` with its merged entity and whether a root references it.
+
+    The merged entity is None for identifiers that are only referenced by the
+    ``hasPart`` of a root entity.
+    """
+    with tempfile.TemporaryDirectory(
+        prefix="crategen-merge-", dir=temp_dir
+    ) as spill_dir:
+        runs = _spill_runs(input_paths, spill_dir, max_entities, split_root_parts)
+        runs = _reduce_runs(runs, spill_dir, max_open_runs)
+        records = heapq.merge(*(_read_run(run) for run in runs), key=_sort_key)
+        for entity_id, group in itertools.groupby(
+            records, key=lambda record: record[0]
+        ):
+            entities = [record[3] for record in group]
+            referenced = None in entities
+            merged = _merge_group(entity for entity in entities if entity is not None)
+            yield entity_id, merged, referenced
+
+
+def iter_merged_entities(
+    input_paths,
+    max_entities=DEFAULT_MAX_ENTITIES,
+    max_open_runs=DEFAULT_MAX_OPEN_RUNS,
+    temp_dir=None,
+):
+    """Yield the deduplicated entities of many crates, sorted by ``@id``.
+
+    Args:
+        input_paths: Paths to the crates, in precedence order.
+        max_entities: Maximum number of entities held in memory before spilling.
+        max_open_runs: Maximum number of run files merged at once.
+        temp_dir: Directory for the spill files. Defaults to the system temp directory.
+
+    Yields:
+        dict: The merged entities.
+    """
+    for _, merged, _ in _iter_groups(
+        input_paths, max_entities, max_open_runs, temp_dir, split_root_parts=False
+    ):
+        yield merged
+
+
+def merge_crates(
+    input_paths,
+    output_path,
+    max_entities=DEFAULT_MAX_ENTITIES,
+    max_open_runs=DEFAULT_MAX_OPEN_RUNS,
+    temp_dir=None,
+):
+    """Merge many crates into one RO-Crate document with a deduplicated ``@graph``.
+
+    The identifiers of the merged entities, and of the entities the input
+    roots reference, are spooled to a temporary file in ``@id`` order, so the
+    ``hasPart`` list of the root data entity is written as a stream after all
+    other entities.
+
+    Args:
+        input_paths: Paths to the crates, in precedence order. Each may be a
+            WRROC object, a list, an ``@graph`` document or NDJSON, optionally
+            compressed.
+        output_path: Path of the merged crate. Compressed if its extension asks for it.
+        max_entities: Maximum number of entities held in memory before spilling.
+        max_open_runs: Maximum number of run files merged at once.
+        temp_dir: Directory for the spill files. Defaults to the system temp directory.
+
+    Returns:
+        int: The number of merged entities, not counting the metadata
+        descriptor and the root data entity.
+    """
+    descriptor = metadata_descriptor()
+    root = root_data_entity()
+    count = 0
+    with (
+        open_output(output_path) as output_file,
+        tempfile.TemporaryFile("w+", encoding="utf-8", dir=temp_dir) as part_ids,
+    ):
+        output_file.write('{\n    "@context": ')
+        output_file.write(json.dumps(RO_CRATE_CONTEXT))
+        output_file.write(',\n    "@graph": [')
+        for entity_id, entity, referenced in _iter_groups(
+            input_paths, max_entities, max_open_runs, temp_dir, split_root_parts=True
+        ):
+            if entity_id == METADATA_DESCRIPTOR_ID:
+                if entity is not None:
+                    descriptor = merge_entities(entity, descriptor)
+                continue
+            if entity_id == ROOT_ENTITY_ID:
+                if entity is not None:
+                    root = merge_entities(root, entity)
+                continue
+            if entity is not None:
+                output_file.write("\n        " + json.dumps(entity) + ",")
+                count += 1
+            if entity is not None or referenced:
+                part_ids.write(json.dumps({"@id": entity_id}) + "\n")
+
+        output_file.write("\n        " + json.dumps(descriptor) + ",")
+        output_file.write("\n        " + json.dumps(root)[:-1] + ', "hasPart": [')
+        part_ids.seek(0)
+        for index, part in enumerate(part_ids):
+            output_file.write((", " if index else "") + part.rstrip("\n"))
+        output_file.write("]}\n    ]\n}\n")
+    return count
@@ -5,6 +5,13 @@ Workflow Execution Services (WES), and WRROC. These models are used for data val
 throughout the CrateGen project.
 """
 
+from .compact_models import (
+    TESExecutorLogRow,
+    TESInputRow,
+    TESOutputFileLogRow,
+    TESOutputRow,
+    compact_task,
+)
 from .tes_models import (
     TESData,
     TESExecutor,
@@ -29,4 +36,9 @@ __all__ = [
     "TESOutputFileLog",
     "TESFileType",
     "TESState",
+    "TESInputRow",
+    "TESOutputRow",
+    "TESExecutorLogRow",
+    "TESOutputFileLogRow",
+    "compact_task",
 ]
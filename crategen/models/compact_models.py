@@ -0,0 +1,229 @@
+"""Compact storage for validated TES records.
+
+Pydantic models carry a per-instance ``__dict__`` and ``__fields_set__``, which
+dominates memory use for tasks with many inputs, outputs or logs. The row types
+in this module are ``NamedTuple`` subclasses without a per-instance dict. Each
+record is validated with the corresponding model from ``tes_models`` and then
+stored as a row, so only one model instance is alive at a time.
+
+Rows provide a dict-like ``get`` method, so the converters consume compact
+tasks exactly like the raw TES dicts. Like the top-level properties, which are
+kept with ``exclude_unset=True``, row fields that were not given are None
+rather than the defaults of the models.
+
+Collections are checked like the list fields of ``TESData``, so a task is
+accepted or rejected exactly as ``TESData`` would. Every error is raised as a
+``pydantic.ValidationError`` located at the offending item.
+"""
+
+from enum import Enum
+from typing import NamedTuple, Optional
+
+from pydantic import ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.errors import DictError, ListError, MissingError, NoneIsNotAllowedError
+from pydantic.validators import dict_validator, list_validator
+
+from .tes_models import (
+    TESData,
+    TESExecutorLog,
+    TESInput,
+    TESOutput,
+    TESOutputFileLog,
+    TESTaskLog,
+)
+
+
+def _get(self, key, default=None):
+    """Return the value of a field, or ``default`` if it is unset or unknown.
+
+    Args:
+        key: The field name.
+        default: The value returned for unset or unknown fields.
+
+    Returns:
+        The field value or ``default``.
+    """
+    if key not in self._fields:
+        return default
+    value = getattr(self, key)
+    return default if value is None else value
+
+
+class TESInputRow(NamedTuple):
+    """Validated TES input. See ``TESInput`` for the field descriptions."""
+
+    name: Optional[str]
+    description: Optional[str]
+    url: Optional[str]
+    path: str
+    type: Optional[str]
+    content: Optional[str]
+
+    def get(self, key, default=None):
+        """Return a field value like ``dict.get``, treating unset fields as missing."""
+        return _get(self, key, default)
+
+
+class TESOutputRow(NamedTuple):
+    """Validated TES output. See ``TESOutput`` for the field descriptions."""
+
+    name: Optional[str]
+    description: Optional[str]
+    url: str
+    path: str
+    type: Optional[str]
+    path_prefix: Optional[str]
+
+    def get(self, key, default=None):
+        """Return a field value like ``dict.get``, treating unset fields as missing."""
+        return _get(self, key, default)
+
+
+class TESExecutorLogRow(NamedTuple):
+    """Validated TES executor log. See ``TESExecutorLog`` for the field descriptions."""
+
+    start_time: Optional[str]
+    end_time: Optional[str]
+    stdout: Optional[str]
+    stderr: Optional[str]
+    exit_code: int
+
+    def get(self, key, default=None):
+        """Return a field value like ``dict.get``, treating unset fields as missing."""
+        return _get(self, key, default)
+
+
+class TESOutputFileLogRow(NamedTuple):
+    """Validated TES output file log. See ``TESOutputFileLog`` for the field descriptions."""
+
+    url: str
+    path: str
+    size_bytes: str
+
+    def get(self, key, default=None):
+        """Return a field value like ``dict.get``, treating unset fields as missing."""
+        return _get(self, key, default)
+
+
+def _row(row_type, model_type, data):
+    """Validate one record with its model and return it as a row.
+
+    Fields that were not given are stored as None, even if the model fills in
+    a default, so rows match the raw record like ``dict(exclude_unset=True)``.
+    """
+    model = model_type(**data)
+    values = []
+    for field in row_type._fields:
+        if field not in model.__fields_set__:
+            values.append(None)
+            continue
+        value = getattr(model, field)
+        if isinstance(value, Enum):
+            value = value.value
+        elif isinstance(value, str):
+            value = str(value)
+        values.append(value)
+    return row_type(*values)
+
+
+def _invalid(exc, *loc):
+    """Return a ``ValidationError`` of ``TESData`` for an error at ``loc``."""
+    return ValidationError([ErrorWrapper(exc, loc=loc)], TESData)
+
+
+def _items(value, *loc):
+    """Return the items of a list field, coerced like a pydantic list field."""
+    try:
+        return list_validator(value)
+    except ListError as exc:
+        raise _invalid(exc, *loc) from None
+
+
+def _record(item, *loc):
+    """Return a record of a list field, coerced like a pydantic model field."""
+    try:
+        return dict_validator(item)
+    except DictError as exc:
+        raise _invalid(exc, *loc) from None
+
+
+def _rows(row_type, model_type, items, *loc):
+    rows = []
+    for index, item in enumerate(_items(items, *loc)):
+        record = _record(item, *loc, index)
+        try:
+            rows.append(_row(row_type, model_type, record))
+        except ValidationError as exc:
+            raise _invalid(exc, *loc, index) from None
+    return tuple(rows)
+
+
+TES_COLLECTIONS = ("inputs", "outputs", "logs")
+
+
+def compact_task(tes_data, collections=TES_COLLECTIONS):
+    """Validate a TES task and store its record collections as compact rows.
+
+    Top-level properties and executors are validated with ``TESData`` and kept
+    as plain values. Inputs, outputs, executor logs and output file logs are
+    validated one record at a time and stored as tuples of rows.
+
+    Args:
+        tes_data: The TES task as a dict.
+        collections: The record collections to validate and keep. Other
+            collections are neither read nor validated and are left out of
+            the result.
+
+    Returns:
+        dict: The validated task, which the converters accept in place of the raw TES data.
+
+    Raises:
+        pydantic.ValidationError: If any part of the task is invalid. Errors in
+            record collections are located at the index of the invalid item.
+    """
+    if not isinstance(tes_data, dict):
+        raise _invalid(DictError(), "__root__")
+    scalars = {
+        key: value for key, value in tes_data.items() if key not in TES_COLLECTIONS
+    }
+    task = TESData(**scalars).dict(exclude_unset=True)
+    if "state" in task:
+        task["state"] = task["state"].value
+
+    inputs = tes_data.get("inputs") if "inputs" in collections else None
+    if inputs is not None:
+        task["inputs"] = _rows(TESInputRow, TESInput, inputs, "inputs")
+    outputs = tes_data.get("outputs") if "outputs" in collections else None
+    if outputs is not None:
+        task["outputs"] = _rows(TESOutputRow, TESOutput, outputs, "outputs")
+    logs = tes_data.get("logs") if "logs" in collections else None
+    if logs is not None:
+        task["logs"] = [
+            _compact_task_log(_record(log, "logs", index), "logs", index)
+            for index, log in enumerate(_items(logs, "logs"))
+        ]
+    return task
+
+
+def _compact_task_log(log, *loc):
+    """Validate a TES task log and store its executor and output logs as rows."""
+    for key in ("logs", "outputs"):
+        if key not in log:
+            raise _invalid(MissingError(), *loc, key)
+        if log[key] is None:
+            raise _invalid(NoneIsNotAllowedError(), *loc, key)
+    scalars = {
+        key: value for key, value in log.items() if key not in ("logs", "outputs")
+    }
+    try:
+        task_log = TESTaskLog(logs=[], outputs=[], **scalars).dict(exclude_unset=True)
+    except ValidationError as exc:
+        raise _invalid(exc, *loc) from None
+    task_log["logs"] = _rows(
+        TESExecutorLogRow, TESExecutorLog, log["logs"], *loc, "logs"
+    )
+    task_log["outputs"] = _rows(
+        TESOutputFileLogRow, TESOutputFileLog, log["outputs"], *loc, "outputs"
+    )
+    return task_log
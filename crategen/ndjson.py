@@ -0,0 +1,483 @@
+"""Parallel conversion of newline-delimited JSON (NDJSON) files.
+
+The input file is memory-mapped and split into byte ranges that end on line
+boundaries. Each worker process maps the file itself and parses, optionally
+validates, converts and writes its own range, so the parent process never
+parses or pickles records.
+
+Compressed inputs cannot be split into byte ranges; they are decompressed and
+converted as a single stream instead. The stream is checkpointed by input line
+number and written to one uncompressed shard, which is copied into the output,
+compressed as needed, when the conversion is done.
+"""
+
+import contextlib
+import functools
+import json
+import mmap
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+from .checkpoint import CheckpointJournal, conversion_options, fsync_path
+from .compression import detect_compression, open_input, open_output
+from .converter_manager import ConverterManager
+from .converters import tes_converter
+from .models import compact_task
+
+DEFAULT_CHECKPOINT_EVERY = 10_000
+
+# Validators of input records by conversion type, with the record collections
+# each WRROC property reads. A validator validates a record with the input
+# models and returns data the converters accept; it only validates the
+# collections passed to it.
+INPUT_VALIDATORS = {
+    "tes-to-wrroc": (compact_task, tes_converter.FIELD_COLLECTIONS),
+}
+
+
+def input_validator(conversion_type, validate_input, fields=None):
+    """Return the input record validator of a conversion type.
+
+    With a projection, record collections that none of the requested
+    properties read are skipped by validation as well as by conversion.
+
+    Args:
+        conversion_type: Type of conversion to perform.
+        validate_input: Whether input records are validated.
+        fields: WRROC properties to compute, or None for all of them.
+
+    Returns:
+        The validator, or None if input records are not validated.
+
+    Raises:
+        ValueError: If validation is requested but no input model exists for
+            the conversion type.
+    """
+    if not validate_input:
+        return None
+    if conversion_type not in INPUT_VALIDATORS:
+        raise ValueError(
+            f"Input validation is not supported for '{conversion_type}'. "
+            f"Supported conversion types are: {', '.join(INPUT_VALIDATORS)}"
+        )
+    validate, field_collections = INPUT_VALIDATORS[conversion_type]
+    if fields is None:
+        return validate
+    collections = frozenset(
+        field_collections[field] for field in fields if field in field_collections
+    )
+    return functools.partial(validate, collections=collections)
+
+
+def split_ranges(path, parts):
+    """Split a file into byte ranges aligned on newlines.
+
+    Args:
+        path: Path to the NDJSON file.
+        parts: The desired number of ranges.
+
+    Returns:
+        list: ``(start, end)`` tuples covering the file, in order. Fewer than
+        ``parts`` ranges are returned if the file has too few lines.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    boundaries = [0]
+    with (
+        open(path, "rb") as file,
+        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+    ):
+        for index in range(1, parts):
+            target = max(size * index // parts, boundaries[-1])
+            newline = mapped.find(b"\n", target)
+            if newline == -1 or newline + 1 >= size:
+                break
+            if newline + 1 > boundaries[-1]:
+                boundaries.append(newline + 1)
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:], strict=True))
+
+
+def shard_path(output_path, index):
+    """Return the path of an output shard.
+
+    Args:
+        output_path: Path of the merged output file.
+        index: Index of the shard.
+
+    Returns:
+        str: The shard path.
+    """
+    return f"{output_path}.part-{index:05d}"
+
+
+def convert_range(  # noqa: PLR0913
+    input_path,
+    start,
+    end,
+    conversion_type,
+    output_path,
+    journal_path=None,
+    shard=None,
+    resume_from=None,
+    checkpoint_every=DEFAULT_CHECKPOINT_EVERY,
+    fields=None,
+    check_every=None,
+    validate_input=False,
+):
+    """Convert the records in one byte range of an NDJSON file.
+
+    With a journal, the output is synced and the input offset, output size and
+    record count are journaled every ``checkpoint_every`` records and at the
+    end of the range.
+
+    Args:
+        input_path: Path to the NDJSON input file.
+        start: Offset of the first byte of the range.
+        end: Offset one past the last byte of the range.
+        conversion_type: Type of conversion to perform.
+        output_path: Path of the NDJSON file the converted records are written to.
+        journal_path: Path of the checkpoint journal, or None to disable checkpoints.
+        shard: Index of the range, used to identify its journal entries.
+        resume_from: The last journal entry of this shard, to continue from
+            its input offset after truncating the output to its size.
+        checkpoint_every: Number of records between two checkpoints.
+        fields: WRROC properties to compute, or None for all of them.
+        check_every: Validate one record out of this many against the profile.
+            No validation if None or 0.
+        validate_input: Whether to validate every input record with the input
+            models before converting it.
+
+    Returns:
+        int: The number of converted records in the range, including resumed ones.
+    """
+    manager = ConverterManager(fields=fields, check_every=check_every)
+    validate = input_validator(conversion_type, validate_input, fields)
+    position, size, count = start, 0, 0
+    if resume_from:
+        position, size, count = (
+            resume_from["offset"],
+            resume_from["size"],
+            resume_from["count"],
+        )
+    journal = CheckpointJournal(journal_path) if journal_path else None
+
+    def checkpoint():
+        output_file.flush()
+        os.fsync(output_file.fileno())
+        entry = {"shard": shard, "offset": position, "size": output_file.tell()}
+        journal.record({**entry, "count": count}, sync=True)
+
+    with (
+        open(input_path, "rb") as file,
+        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+        open(output_path, "r+b" if resume_from else "wb") as output_file,
+        journal or contextlib.nullcontext(),
+    ):
+        output_file.truncate(size)
+        output_file.seek(size)
+        since_checkpoint = 0
+        while position < end:
+            newline = mapped.find(b"\n", position, end)
+            line_end = end if newline == -1 else newline
+            line = mapped[position:line_end]
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except ValueError as exc:
+                    raise ValueError(
+                        f"Invalid JSON record at byte offset {position} of '{input_path}': {exc}"
+                    ) from exc
+                if validate is not None:
+                    try:
+                        record = validate(record)
+                    except ValueError as exc:
+                        raise ValueError(
+                            f"Invalid input record at byte offset {position} of '{input_path}': {exc}"
+                        ) from exc
+                result = manager.convert(conversion_type, record)
+                output_file.write(json.dumps(result).encode("utf-8"))
+                output_file.write(b"\n")
+                count += 1
+                since_checkpoint += 1
+            position = line_end + 1
+            if journal and since_checkpoint >= checkpoint_every:
+                checkpoint()
+                since_checkpoint = 0
+        position = end
+        if journal:
+            checkpoint()
+    return count
+
+
+def convert_stream(  # noqa: PLR0913
+    input_path,
+    output_path,
+    conversion_type,
+    fields=None,
+    check_every=None,
+    validate_input=False,
+    journal_path=None,
+    resume_from=None,
+    checkpoint_every=DEFAULT_CHECKPOINT_EVERY,
+):
+    """Convert a possibly compressed NDJSON file sequentially.
+
+    With a journal, the output is synced and the number of input lines read,
+    the output size and the record count are journaled every
+    ``checkpoint_every`` records and at the end of the input. The output must
+    then be uncompressed, so it can be truncated when resuming.
+
+    Args:
+        input_path: Path to the NDJSON input file.
+        output_path: Path of the NDJSON output file.
+        conversion_type: Type of conversion to perform.
+        fields: WRROC properties to compute, or None for all of them.
+        check_every: Validate one record out of this many against the profile.
+            No validation if None or 0.
+        validate_input: Whether to validate every input record with the input
+            models before converting it.
+        journal_path: Path of the checkpoint journal, or None to disable checkpoints.
+        resume_from: The last journal entry of the stream, to skip the input
+            lines it covers after truncating the output to its size.
+        checkpoint_every: Number of records between two checkpoints.
+
+    Returns:
+        int: The number of converted records, including resumed ones.
+    """
+    manager = ConverterManager(fields=fields, check_every=check_every)
+    validate = input_validator(conversion_type, validate_input, fields)
+    skip, size, count = 0, 0, 0
+    if resume_from:
+        skip, size, count = (
+            resume_from["line"],
+            resume_from["size"],
+            resume_from["count"],
+        )
+    journal = CheckpointJournal(journal_path) if journal_path else None
+    line_number = skip
+
+    def checkpoint():
+        output_file.flush()
+        os.fsync(output_file.fileno())
+        entry = {"shard": 0, "line": line_number, "size": output_file.tell()}
+        journal.record({**entry, "count": count}, sync=True)
+
+    if resume_from:
+        output_file = open(output_path, "r+b")  # noqa: SIM115
+    else:
+        output_file = open_output(output_path, "wb")
+    with open_input(
+        input_path
+    ) as input_file, output_file, journal or contextlib.nullcontext():
+        output_file.truncate(size)
+        output_file.seek(size)
+        since_checkpoint = 0
+        for line_number, line in enumerate(input_file, start=1):
+            if line_number <= skip or not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                raise ValueError(
+                    f"Invalid JSON record on line {line_number} of '{input_path}': {exc}"
+                ) from exc
+            if validate is not None:
+                try:
+                    record = validate(record)
+                except ValueError as exc:
+                    raise ValueError(
+                        f"Invalid input record on line {line_number} of '{input_path}': {exc}"
+                    ) from exc
+            result = manager.convert(conversion_type, record)
+            output_file.write(json.dumps(result).encode("utf-8"))
+            output_file.write(b"\n")
+            count += 1
+            since_checkpoint += 1
+            if journal and since_checkpoint >= checkpoint_every:
+                checkpoint()
+                since_checkpoint = 0
+        if journal:
+            checkpoint()
+    return count
+
+
+def journal_path_for(output_path):
+    """Return the path of the checkpoint journal of an NDJSON conversion.
+
+    Args:
+        output_path: Path of the merged output file.
+
+    Returns:
+        str: The journal path.
+    """
+    return f"{output_path}.journal"
+
+
+def _plan(input_path, journal, resume, options, new_ranges):
+    """Return the ranges to convert and the progress of each of them.
+
+    The ranges of an interrupted run are reused when resuming, as long as the
+    input file and the conversion options did not change since. Otherwise
+    ``new_ranges`` is called to split the input.
+    """
+    stat = os.stat(input_path)
+    source = {"input": os.path.abspath(input_path), "size": stat.st_size}
+    source["mtime_ns"] = stat.st_mtime_ns
+    source.update(options)
+    entries = journal.read() if resume else []
+    if entries and {key: entries[0].get(key) for key in source} == source:
+        ranges = [tuple(item) for item in entries[0]["ranges"]]
+        progress = {}
+        for entry in entries[1:]:
+            progress[entry["shard"]] = entry
+        return ranges, progress
+
+    journal.remove()
+    ranges = new_ranges()
+    with journal:
+        journal.record({**source, "ranges": ranges}, sync=True)
+    return ranges, {}
+
+
+def convert_ndjson(  # noqa: PLR0913
+    input_path,
+    output_path,
+    conversion_type,
+    workers=None,
+    merge=True,
+    checkpoint=True,
+    resume=False,
+    checkpoint_every=DEFAULT_CHECKPOINT_EVERY,
+    fields=None,
+    check_every=None,
+    validate_input=False,
+):
+    """Convert an NDJSON file in parallel across worker processes.
+
+    With ``checkpoint``, every worker periodically syncs its shard and journals
+    its progress next to ``output_path``. A later run with ``resume`` skips
+    finished ranges without reading them and continues unfinished ones from
+    their last checkpoint. A journal of another input file or of other
+    conversion options is discarded. The journal is removed once the
+    conversion is done. Compressed inputs are converted as a single stream,
+    which is checkpointed and resumed by input line number.
+
+    Args:
+        input_path: Path to the NDJSON input file.
+        output_path: Path of the NDJSON output file.
+        conversion_type: Type of conversion to perform.
+        workers: Number of worker processes. Defaults to the number of CPUs.
+        merge: Whether to merge the per-shard outputs into ``output_path`` in
+            input order. If False, the shards are kept next to ``output_path``
+            uncompressed. Compressed inputs always produce ``output_path``.
+        checkpoint: Whether to journal progress.
+        resume: Whether to continue from an existing journal.
+        checkpoint_every: Number of records between two checkpoints of a worker.
+        fields: WRROC properties to compute, or None for all of them.
+        check_every: Validate one record out of this many against the profile.
+            No validation if None or 0.
+        validate_input: Whether to validate every input record with the input
+            models before converting it.
+
+    Returns:
+        tuple: The number of converted records and the list of written output paths.
+
+    Raises:
+        ValueError: If a record is not valid JSON, fails input validation, or
+            input validation is not supported for the conversion type.
+    """
+    input_validator(conversion_type, validate_input)
+    journal = CheckpointJournal(journal_path_for(output_path))
+    options = conversion_options(
+        conversion_type, fields, check_every, validate_input=validate_input
+    )
+    if detect_compression(input_path):
+        if not (checkpoint or resume):
+            journal.remove()
+            count = convert_stream(
+                input_path,
+                output_path,
+                conversion_type,
+                fields,
+                check_every,
+                validate_input,
+            )
+            return count, [output_path]
+        _, progress = _plan(input_path, journal, resume, options, list)
+        shard = shard_path(output_path, 0)
+        done = progress.get(0) if os.path.exists(shard) else None
+        count = convert_stream(
+            input_path,
+            shard,
+            conversion_type,
+            fields,
+            check_every,
+            validate_input,
+            journal_path=journal.path if checkpoint else None,
+            resume_from=done,
+            checkpoint_every=checkpoint_every,
+        )
+        _merge_shards([shard], output_path, checkpoint)
+        journal.remove()
+        return count, [output_path]
+
+    workers = workers or os.cpu_count() or 1
+    if checkpoint or resume:
+        ranges, progress = _plan(
+            input_path,
+            journal,
+            resume,
+            options,
+            functools.partial(split_ranges, input_path, workers),
+        )
+    else:
+        journal.remove()
+        ranges, progress = split_ranges(input_path, workers), {}
+    shards = [shard_path(output_path, index) for index in range(len(ranges))]
+
+    count = 0
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(ranges)))) as executor:
+        futures = []
+        for index, ((start, end), shard) in enumerate(zip(ranges, shards, strict=True)):
+            done = progress.get(index)
+            if done and done["offset"] >= end and os.path.exists(shard):
+                count += done["count"]
+                continue
+            futures.append(
+                executor.submit(
+                    convert_range,
+                    input_path,
+                    start,
+                    end,
+                    conversion_type,
+                    shard,
+                    journal_path=journal.path if checkpoint else None,
+                    shard=index,
+                    resume_from=done if done and os.path.exists(shard) else None,
+                    checkpoint_every=checkpoint_every,
+                    fields=fields,
+                    check_every=check_every,
+                    validate_input=validate_input,
+                )
+            )
+        count += sum(future.result() for future in futures)
+
+    if merge:
+        _merge_shards(shards, output_path, checkpoint)
+    journal.remove()
+    return count, [output_path] if merge else shards
+
+
+def _merge_shards(shards, output_path, sync):
+    """Concatenate the shards into the output, compressing it as needed, and remove them."""
+    with open_output(output_path, "wb") as output_file:
+        for shard in shards:
+            with open(shard, "rb") as shard_file:
+                shutil.copyfileobj(shard_file, output_file)
+    if sync:
+        fsync_path(output_path)
+    for shard in shards:
+        os.remove(shard)
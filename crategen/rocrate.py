@@ -0,0 +1,37 @@
+"""Identifiers and entities shared by every RO-Crate document CrateGen writes."""
+
+import datetime
+
+RO_CRATE_CONTEXT = "https://w3id.org/ro/crate/1.1/context"
+RO_CRATE_SPECIFICATION = "https://w3id.org/ro/crate/1.1"
+METADATA_DESCRIPTOR_ID = "ro-crate-metadata.json"
+ROOT_ENTITY_ID = "./"
+
+
+def metadata_descriptor():
+    """Return the metadata descriptor entity that points at the root data entity.
+
+    Returns:
+        dict: The ``ro-crate-metadata.json`` entity.
+    """
+    return {
+        "@id": METADATA_DESCRIPTOR_ID,
+        "@type": "CreativeWork",
+        "conformsTo": {"@id": RO_CRATE_SPECIFICATION},
+        "about": {"@id": ROOT_ENTITY_ID},
+    }
+
+
+def root_data_entity():
+    """Return a root data entity published now, without any parts.
+
+    Returns:
+        dict: The ``./`` Dataset entity.
+    """
+    return {
+        "@id": ROOT_ENTITY_ID,
+        "@type": "Dataset",
+        "datePublished": datetime.datetime.now(datetime.timezone.utc).isoformat(
+            timespec="seconds"
+        ),
+    }
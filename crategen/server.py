@@ -0,0 +1,290 @@
+"""Long-lived local HTTP server for low-latency TES and WES to WRROC conversions."""
+
+import json
+import logging
+import os
+import socketserver
+import stat
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .converter_manager import CONVERSION_TYPES, ConverterManager
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+
+class LatencyHistogram:
+    """Thread-safe cumulative histogram of request latencies.
+
+    Attributes:
+        buckets: Upper bounds of the histogram buckets in milliseconds.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        """Initializes an empty histogram with the given bucket bounds."""
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        """Records a single latency measurement.
+
+        Args:
+            seconds: The measured latency in seconds.
+        """
+        milliseconds = seconds * 1000
+        index = len(self.buckets)
+        for position, bound in enumerate(self.buckets):
+            if milliseconds <= bound:
+                index = position
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum_ms += milliseconds
+
+    def snapshot(self):
+        """Returns the current state of the histogram.
+
+        Returns:
+            dict: The cumulative bucket counts, total count and latency sum in milliseconds.
+        """
+        with self._lock:
+            counts = list(self._counts)
+            count = self._count
+            sum_ms = self._sum_ms
+        buckets = []
+        cumulative = 0
+        for bound, bucket_count in zip((*self.buckets, "+Inf"), counts, strict=True):
+            cumulative += bucket_count
+            buckets.append({"le": bound, "count": cumulative})
+        return {"buckets": buckets, "count": count, "sum_ms": sum_ms}
+
+
+class ConversionService:
+    """Shared state of a conversion server.
+
+    Conversions run directly on the request handler threads. A semaphore lets
+    at most ``workers`` of them convert at once; the others wait for a slot.
+    Conversions are pure Python and share the GIL, so run one server per core
+    for multi-core throughput.
+
+    Attributes:
+        manager: The converter manager used for all requests.
+        histogram: Latency histogram of conversion requests.
+    """
+
+    def __init__(self, workers=None, fields=None, check_every=None):
+        """Initializes the converter manager and the concurrency limit.
+
+        Args:
+            workers: Maximum number of concurrent conversions. Defaults to the
+                number of CPUs.
+            fields: WRROC properties to compute, or None for all of them.
+            check_every: Validate one converted record out of this many against
+                the profile. No validation if None or 0.
+        """
+        self.manager = ConverterManager(fields=fields, check_every=check_every)
+        self.histogram = LatencyHistogram()
+        self._slots = threading.BoundedSemaphore(workers or os.cpu_count() or 1)
+
+    def convert(self, conversion_type, payload):
+        """Converts a single payload or a batch of payloads on the calling thread.
+
+        Args:
+            conversion_type: Type of conversion to perform.
+            payload: A TES/WES object, or a list of them.
+
+        Returns:
+            The converted WRROC data, or a list of it for batched payloads.
+        """
+        with self._slots:
+            if isinstance(payload, list):
+                return [self.manager.convert(conversion_type, item) for item in payload]
+            return self.manager.convert(conversion_type, payload)
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    """Request handler exposing the conversion endpoints.
+
+    Endpoints:
+        POST /tes-to-wrroc: Convert a TES task or a list of TES tasks.
+        POST /wes-to-wrroc: Convert a WES run or a list of WES runs.
+        GET /metrics: Request latency histogram.
+        GET /health: Liveness check.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        """Serves the metrics and health endpoints."""
+        if self.path == "/metrics":
+            self._send_json(HTTPStatus.OK, self.server.service.histogram.snapshot())
+        elif self.path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path: '{self.path}'")
+
+    def do_POST(self):
+        """Serves the conversion endpoints."""
+        start = time.perf_counter()
+        conversion_type = self.path.lstrip("/")
+        length = self._content_length()
+        if length is None:
+            return
+        body = self.rfile.read(length)
+        if conversion_type not in CONVERSION_TYPES:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path: '{self.path}'")
+            return
+        try:
+            payload = json.loads(body)
+        except ValueError as exc:
+            self._send_error(HTTPStatus.BAD_REQUEST, f"Invalid JSON payload: {exc}")
+            return
+        try:
+            result = self.server.service.convert(conversion_type, payload)
+        except Exception as exc:
+            self._send_error(
+                HTTPStatus.UNPROCESSABLE_ENTITY, f"Conversion failed: {exc}"
+            )
+            return
+        finally:
+            self.server.service.histogram.observe(time.perf_counter() - start)
+        self._send_json(HTTPStatus.OK, result)
+
+    def log_message(self, format, *args):
+        """Routes access logs through the module logger."""
+        logger.debug(format, *args)
+
+    def _content_length(self):
+        """Return the request body size, or send an error and return None.
+
+        The body of a rejected request is not read, so the connection is
+        closed after the error response.
+        """
+        header = self.headers.get("Content-Length") or "0"
+        try:
+            length = int(header)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            self._send_error(
+                HTTPStatus.BAD_REQUEST, f"Invalid Content-Length: {header!r}"
+            )
+            return None
+        if length > MAX_REQUEST_BYTES:
+            self.close_connection = True
+            self._send_error(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Request body exceeds {MAX_REQUEST_BYTES} bytes",
+            )
+            return None
+        return length
+
+    def _send_error(self, status, message):
+        self._send_json(status, {"error": message})
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ConversionHTTPServer(ThreadingHTTPServer):
+    """Threaded TCP server bound to a conversion service."""
+
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        """Binds the server to a TCP address.
+
+        Args:
+            address: The (host, port) tuple to listen on.
+            service: The conversion service handling requests.
+        """
+        self.service = service
+        super().__init__(address, ConversionRequestHandler)
+
+
+class ConversionUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded Unix domain socket server bound to a conversion service."""
+
+    daemon_threads = True
+
+    def __init__(self, path, service):
+        """Binds the server to a Unix domain socket, replacing a stale socket file.
+
+        Args:
+            path: Filesystem path of the socket.
+            service: The conversion service handling requests.
+
+        Raises:
+            FileExistsError: If ``path`` exists and is not a socket.
+        """
+        self.service = service
+        _remove_socket(path)
+        super().__init__(path, ConversionRequestHandler)
+
+    def server_close(self):
+        """Closes the socket and removes the socket file."""
+        super().server_close()
+        _remove_socket(self.server_address)
+
+
+def _remove_socket(path):
+    """Remove a Unix domain socket file, refusing to remove any other kind of file.
+
+    Raises:
+        FileExistsError: If ``path`` exists and is not a socket.
+    """
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(
+            f"Refusing to replace '{path}': it exists and is not a Unix domain socket."
+        )
+    os.unlink(path)
+
+
+def create_server(  # noqa: PLR0913
+    host="127.0.0.1",
+    port=8000,
+    socket_path=None,
+    workers=None,
+    fields=None,
+    check_every=None,
+):
+    """Creates a conversion server listening on TCP or on a Unix domain socket.
+
+    Args:
+        host: Host name or address to bind when serving over TCP.
+        port: Port to bind when serving over TCP.
+        socket_path: Path of a Unix domain socket. Takes precedence over host and port.
+        workers: Maximum number of concurrent conversions.
+        fields: WRROC properties to compute, or None for all of them.
+        check_every: Validate one converted record out of this many against
+            the profile. No validation if None or 0.
+
+    Returns:
+        The server instance; call ``serve_forever`` to start handling requests.
+
+    Raises:
+        FileExistsError: If ``socket_path`` exists and is not a socket.
+    """
+    service = ConversionService(workers=workers, fields=fields, check_every=check_every)
+    if socket_path:
+        return ConversionUnixServer(socket_path, service)
+    return ConversionHTTPServer((host, port), service)
@@ -0,0 +1,344 @@
+"""Fast validation of generated WRROC output against the Workflow Run RO-Crate profile.
+
+The required types and properties of the profile are compiled once into
+tuples of plain check functions per entity type and projection. Validating an
+entity is then a few dict lookups and ``isinstance`` checks, without JSON-LD
+expansion.
+
+A validator can check every record, or only every Nth record with
+``every=N`` to keep the cost in production close to zero. Every entity must
+declare an ``@type``; flat converter output, which has none, is validated
+with ``assume_type="CreateAction"``. RO-Crate documents with an ``@graph``
+are also checked for a context and a metadata descriptor that points at an
+entity of the graph.
+"""
+
+import functools
+import itertools
+import json
+from typing import NamedTuple, Optional
+
+from rfc3339_validator import validate_rfc3339  # type: ignore
+
+from .compression import NDJSON_EXTENSIONS, open_input, strip_compression_extension
+from .rocrate import METADATA_DESCRIPTOR_ID
+
+CREATE_ACTION_TYPE = "CreateAction"
+ACTION_STATUSES = (
+    "http://schema.org/ActiveActionStatus",
+    "http://schema.org/CompletedActionStatus",
+    "http://schema.org/FailedActionStatus",
+    "http://schema.org/PotentialActionStatus",
+)
+
+
+def _check_identifier(value):
+    if not isinstance(value, str) or not value:
+        return "must be a non-empty string"
+    return None
+
+
+def _check_types(value):
+    for item in value if isinstance(value, list) else (value,):
+        if not isinstance(item, str) or not item:
+            return "must be a type name or a list of type names"
+    return None
+
+
+def _check_text(value):
+    if not isinstance(value, str):
+        return "must be a string"
+    return None
+
+
+def _check_datetime(value):
+    if not isinstance(value, str) or not validate_rfc3339(value):
+        return f"must be an RFC 3339 date-time, got {value!r}"
+    return None
+
+
+def _reference_id(value):
+    if isinstance(value, dict):
+        return value.get("@id")
+    return value
+
+
+def _check_reference(value):
+    for item in value if isinstance(value, list) else (value,):
+        if _check_identifier(_reference_id(item)):
+            return "must reference an entity by a non-empty @id"
+    return None
+
+
+def _check_entities(value):
+    if not isinstance(value, list):
+        return "must be a list of entities"
+    for position, item in enumerate(value):
+        if not isinstance(item, dict) or _check_identifier(item.get("@id")):
+            return f"item {position} must be an entity with a non-empty @id"
+    return None
+
+
+def _check_action_status(value):
+    if _reference_id(value) not in ACTION_STATUSES:
+        return f"must be one of {', '.join(ACTION_STATUSES)}"
+    return None
+
+
+# Property constraints of the profile per entity type, as
+# (property, required, check) tuples. Every entity needs an "@id" and "@type".
+WRROC_PROFILE = {
+    CREATE_ACTION_TYPE: (
+        ("instrument", True, _check_reference),
+        ("name", False, _check_text),
+        ("description", False, _check_text),
+        ("actionStatus", False, _check_action_status),
+        ("object", False, _check_entities),
+        ("result", False, _check_entities),
+        ("startTime", False, _check_datetime),
+        ("endTime", False, _check_datetime),
+    ),
+    "Dataset": (("hasPart", False, _check_entities),),
+}
+_ENTITY_CHECKS = (("@id", True, _check_identifier), ("@type", True, _check_types))
+
+
+@functools.lru_cache(maxsize=256)
+def compile_checks(entity_types, fields=None):
+    """Compile the checks of the given entity types and projection.
+
+    Args:
+        entity_types (tuple[str, ...]): The ``@type`` values of the entity.
+        fields (tuple[str, ...]): The projected WRROC properties, or None for all
+            of them. Checks of other properties, including required ones, are
+            skipped.
+
+    Returns:
+        tuple: The ``(property, required, check)`` tuples that apply.
+    """
+    checks = {}
+    for entity_type in entity_types:
+        for check in WRROC_PROFILE.get(entity_type, ()):
+            checks.setdefault(check[0], check)
+    return tuple(
+        check
+        for check in (*_ENTITY_CHECKS, *checks.values())
+        if fields is None or check[0] in fields
+    )
+
+
+class ValidationIssue(NamedTuple):
+    """A profile violation of one entity.
+
+    Attributes:
+        entity_id: The ``@id`` of the entity, or None for document-level issues.
+        property: The offending property, or None for document-level issues.
+        message: Description of the violation.
+    """
+
+    entity_id: Optional[str]
+    property: Optional[str]
+    message: str
+
+    def __str__(self):
+        parts = (self.entity_id, self.property, self.message)
+        return ": ".join(part for part in parts if part)
+
+
+class WRROCValidationError(ValueError):
+    """Raised when generated WRROC output violates the profile.
+
+    Attributes:
+        issues: The profile violations found.
+    """
+
+    def __init__(self, issues):
+        """Initializes the error from the list of issues.
+
+        Args:
+            issues: The ``ValidationIssue`` instances found.
+        """
+        self.issues = list(issues)
+        super().__init__(
+            "WRROC output violates the profile: "
+            + "; ".join(str(issue) for issue in self.issues)
+        )
+
+
+def _as_types(value):
+    if value is None:
+        return ()
+    return tuple(value) if isinstance(value, list) else (value,)
+
+
+class ProfileValidator:
+    """Validates generated WRROC output, optionally only every Nth record.
+
+    Sampling uses a shared counter, so a validator used from several threads
+    still checks about one in ``every`` records.
+
+    Attributes:
+        every: Validate one record out of this many.
+        fields: The projected WRROC properties, or None for all of them.
+        assume_type: The ``@type`` assumed for records without one, or None to
+            report the missing ``@type``.
+    """
+
+    def __init__(self, every=1, fields=None, assume_type=None):
+        """Initializes the validator.
+
+        Args:
+            every: Validate one record out of this many. 1 validates every record.
+            fields: The projected WRROC properties of the output, or None for all
+                of them. Only these properties are checked.
+            assume_type: The ``@type`` assumed for records that do not declare
+                one, for example ``CREATE_ACTION_TYPE`` for flat converter output.
+                None reports a missing ``@type``. Entities of an ``@graph``
+                document never get an assumed type.
+
+        Raises:
+            ValueError: If ``every`` is smaller than 1.
+        """
+        if every < 1:
+            raise ValueError(f"'every' must be at least 1, got {every}")
+        self.every = every
+        self.fields = None if fields is None else tuple(fields)
+        self.assume_type = assume_type
+        self._counter = itertools.count()
+
+    def validate(self, data):
+        """Validates a WRROC entity, a list of entities or an ``@graph`` document.
+
+        Args:
+            data: The WRROC output.
+
+        Returns:
+            list: The ``ValidationIssue`` instances found. Empty if the output conforms.
+        """
+        if isinstance(data, list):
+            return [issue for item in data for issue in self.validate(item)]
+        if not isinstance(data, dict):
+            return [ValidationIssue(None, None, "must be a JSON object")]
+        if "@graph" in data:
+            return self._validate_document(data)
+        return self._validate_entity(data, self.assume_type)
+
+    def sample(self, data):
+        """Validates a record if it is one of the sampled ones.
+
+        Args:
+            data: The WRROC output of one record.
+
+        Returns:
+            list: The issues found, or None if the record was not sampled.
+        """
+        if next(self._counter) % self.every:
+            return None
+        return self.validate(data)
+
+    def check(self, data):
+        """Validates a record if it is one of the sampled ones and raises on violations.
+
+        Args:
+            data: The WRROC output of one record.
+
+        Raises:
+            WRROCValidationError: If the sampled record violates the profile.
+        """
+        issues = self.sample(data)
+        if issues:
+            raise WRROCValidationError(issues)
+
+    def _validate_entity(self, entity, assume_type=None):
+        entity_id = entity.get("@id")
+        entity_type = entity.get("@type", assume_type)
+        # Malformed types are reported by the "@type" check and only get the
+        # checks every entity has, so unhashable values never reach the cache.
+        entity_types = (
+            ()
+            if entity_type is None or _check_types(entity_type)
+            else _as_types(entity_type)
+        )
+        issues = []
+        for name, required, check in compile_checks(entity_types, self.fields):
+            value = entity_type if name == "@type" else entity.get(name)
+            if value is None:
+                if required:
+                    issues.append(ValidationIssue(entity_id, name, "is required"))
+                continue
+            message = check(value)
+            if message:
+                issues.append(ValidationIssue(entity_id, name, message))
+        return issues
+
+    def _validate_document(self, document):
+        issues = []
+        if "@context" not in document:
+            issues.append(ValidationIssue(None, "@context", "is required"))
+        graph = document["@graph"]
+        if not isinstance(graph, list):
+            return [*issues, ValidationIssue(None, "@graph", "must be a list")]
+
+        ids = set()
+        descriptor = None
+        for entity in graph:
+            if not isinstance(entity, dict):
+                issues.append(ValidationIssue(None, "@graph", "must contain objects"))
+                continue
+            ids.add(entity.get("@id"))
+            if entity.get("@id") == METADATA_DESCRIPTOR_ID:
+                descriptor = entity
+            issues.extend(self._validate_entity(entity))
+
+        if descriptor is None:
+            issues.append(
+                ValidationIssue(
+                    METADATA_DESCRIPTOR_ID, None, "metadata descriptor is missing"
+                )
+            )
+        elif _reference_id(descriptor.get("about")) not in ids:
+            issues.append(
+                ValidationIssue(
+                    METADATA_DESCRIPTOR_ID,
+                    "about",
+                    "must reference the root data entity of the graph",
+                )
+            )
+        return issues
+
+
+def iter_records(path):
+    """Yield the records of a WRROC output file with their line numbers.
+
+    Every line of an NDJSON file is one record; any other file is a single
+    JSON record. Compressed files are decompressed transparently. A record
+    that is not valid JSON is yielded as a ``ValidationIssue`` instead, so the
+    remaining records can still be checked.
+
+    Args:
+        path: Path to the WRROC output file.
+
+    Yields:
+        tuple: The line number the record starts on and the parsed record, or
+        the ``ValidationIssue`` of a malformed record.
+    """
+    with open_input(path) as file:
+        if strip_compression_extension(path).endswith(NDJSON_EXTENSIONS):
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield line_number, _json_issue(exc)
+        else:
+            try:
+                record = json.load(file)
+            except json.JSONDecodeError as exc:
+                yield exc.lineno, _json_issue(exc)
+            else:
+                yield 1, record
+
+
+def _json_issue(exc):
+    return ValidationIssue(None, None, f"is not valid JSON: {exc.msg}")
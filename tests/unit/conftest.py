@@ -0,0 +1,56 @@
+"""SHARED UNIT TEST FIXTURES"""
+
+import copy
+
+import pytest
+
+TES_TASK = {
+    "id": "task-id",
+    "name": "task",
+    "state": "COMPLETE",
+    "executors": [{"image": "ubuntu:20.04"}],
+    "inputs": [{"url": "s3://bucket/input", "path": "/data/input"}],
+    "outputs": [{"url": "s3://bucket/output", "path": "/data/output"}],
+    "creation_time": "2020-10-02T16:00:00.000Z",
+    "logs": [{"end_time": "2020-10-02T17:00:00.000Z"}],
+}
+
+WES_RUN = {
+    "run_id": "run-id",
+    "state": "COMPLETE",
+    "run_log": {
+        "name": "run",
+        "start_time": "2020-10-02T16:00:00Z",
+        "end_time": "2020-10-02T17:00:00Z",
+    },
+    "outputs": [{"location": "s3://bucket/output", "name": "output"}],
+}
+
+
+@pytest.fixture
+def tes_task():
+    """A TES task with every property the converter reads."""
+    return copy.deepcopy(TES_TASK)
+
+
+@pytest.fixture
+def wes_run():
+    """A WES run without a workflow request."""
+    return copy.deepcopy(WES_RUN)
+
+
+@pytest.fixture
+def make_tes_task():
+    """Factory of TES tasks with a distinct id, input and start time."""
+
+    def make(index, state="COMPLETE", image="ubuntu:20.04"):
+        return {
+            "id": f"task-{index}",
+            "state": state,
+            "executors": [{"image": image}],
+            "inputs": [{"url": f"s3://bucket/input-{index}", "path": "/in"}],
+            "outputs": [{"url": "s3://bucket/shared-output", "path": "/out"}],
+            "creation_time": f"2024-10-{index + 10:02d}T16:00:00.000Z",
+        }
+
+    return make
@@ -0,0 +1,156 @@
+"""ARCHIVE UNIT TESTS"""
+
+import json
+import zipfile
+
+import pytest
+
+from crategen import archive
+from crategen.archive import METADATA_FILE_NAME, log_paths, write_crate_archive
+from crategen.converter_manager import ConverterManager
+from crategen.validation import ProfileValidator
+
+wrroc_data = {
+    "@id": "task-id",
+    "name": "task",
+    "object": [{"@id": "https://example.com/input.txt", "name": "/data/input.txt"}],
+    "result": [],
+}
+
+
+def read_entities(zip_file):
+    """Return the entities of an archive's metadata file by @id."""
+    document = json.loads(zip_file.read(METADATA_FILE_NAME))
+    return {entity["@id"]: entity for entity in document["@graph"]}
+
+
+class TestWriteCrateArchive:
+    """Test suite for the zipped RO-Crate writer."""
+
+    def test_metadata_member(self, tmp_path):
+        """The metadata file holds the entity in an RO-Crate document."""
+        archive_path = tmp_path / "crate.zip"
+        members = write_crate_archive(wrroc_data, archive_path)
+
+        assert members == [METADATA_FILE_NAME]
+        with zipfile.ZipFile(archive_path) as zip_file:
+            entities = read_entities(zip_file)
+        assert list(entities) == [METADATA_FILE_NAME, "./", "task-id"]
+        assert entities["task-id"] == {"@type": "CreateAction", **wrroc_data}
+        assert entities["./"]["mentions"] == {"@id": "task-id"}
+        assert entities["./"]["hasPart"] == []
+
+    def test_include_data(self, tmp_path):
+        """Local files are added to the archive and their identifiers relocated."""
+        first = tmp_path / "a" / "out.txt"
+        second = tmp_path / "b" / "out.txt"
+        first.parent.mkdir()
+        second.parent.mkdir()
+        first.write_text("first")
+        second.write_text("second")
+        data = {
+            **wrroc_data,
+            "result": [
+                {"@id": f"file://{first}", "name": "/out/first"},
+                {"@id": str(second), "name": "/out/second"},
+            ],
+        }
+        archive_path = tmp_path / "crate.zip"
+
+        members = write_crate_archive(data, archive_path, include_data=True)
+
+        assert members == [METADATA_FILE_NAME, "data/out.txt", "data/out_1.txt"]
+        with zipfile.ZipFile(archive_path) as zip_file:
+            entities = read_entities(zip_file)
+            metadata = entities["task-id"]
+            assert [r["@id"] for r in metadata["result"]] == members[1:]
+            assert metadata["object"] == wrroc_data["object"]
+            assert entities["./"]["hasPart"] == [{"@id": m} for m in members[1:]]
+            assert entities["data/out_1.txt"] == {
+                "@id": "data/out_1.txt",
+                "@type": "File",
+                "name": "out.txt",
+            }
+            assert zip_file.read("data/out.txt") == b"first"
+            assert zip_file.read("data/out_1.txt") == b"second"
+
+    def test_large_member(self, tmp_path, monkeypatch):
+        """Large members are copied through the worker thread intact."""
+        monkeypatch.setattr(archive, "CHUNK_SIZE", 16)
+        monkeypatch.setattr(archive, "LARGE_MEMBER_SIZE", 32)
+        payload = bytes(range(256)) * 10
+        source = tmp_path / "large.bin"
+        source.write_bytes(payload)
+        data = {**wrroc_data, "result": [{"@id": str(source), "name": "/large"}]}
+        archive_path = tmp_path / "crate.zip"
+
+        write_crate_archive(data, archive_path, include_data=True, compression_level=9)
+
+        with zipfile.ZipFile(archive_path) as zip_file:
+            assert zip_file.read("data/large.bin") == payload
+
+    def test_include_logs(self, tmp_path):
+        """Local executor log files are added under logs/, inline content is skipped."""
+        stdout = tmp_path / "stdout.txt"
+        stdout.write_text("hello")
+        tes_data = {
+            "logs": [
+                {
+                    "logs": [
+                        {"stdout": f"file://{stdout}", "stderr": "inline content"},
+                        {"stdout": str(stdout), "stderr": "s3://bucket/stderr"},
+                    ]
+                }
+            ]
+        }
+        archive_path = tmp_path / "crate.zip"
+
+        members = write_crate_archive(
+            wrroc_data, archive_path, log_files=log_paths(tes_data)
+        )
+
+        assert members == [METADATA_FILE_NAME, "logs/stdout.txt"]
+        with zipfile.ZipFile(archive_path) as zip_file:
+            assert zip_file.read("logs/stdout.txt") == b"hello"
+
+    def test_metadata_conforms(self, tmp_path):
+        """The metadata of a converted task with data and logs passes validation."""
+        output = tmp_path / "out.txt"
+        output.write_text("result")
+        stdout = tmp_path / "stdout.txt"
+        stdout.write_text("hello")
+        tes_task = {
+            "id": "task-id",
+            "state": "COMPLETE",
+            "executors": [{"image": "ubuntu:20.04"}],
+            "outputs": [{"url": f"file://{output}", "path": "/data/out.txt"}],
+            "logs": [{"logs": [{"stdout": str(stdout)}]}],
+        }
+        data = ConverterManager().convert("tes-to-wrroc", tes_task)
+        archive_path = tmp_path / "crate.zip"
+
+        members = write_crate_archive(
+            data, archive_path, include_data=True, log_files=log_paths(tes_task)
+        )
+
+        assert members == [METADATA_FILE_NAME, "data/out.txt", "logs/stdout.txt"]
+        with zipfile.ZipFile(archive_path) as zip_file:
+            document = json.loads(zip_file.read(METADATA_FILE_NAME))
+        assert ProfileValidator().validate(document) == []
+
+    def test_wes_log_paths(self, tmp_path):
+        """WES run and task log files are collected."""
+        stderr = tmp_path / "stderr.txt"
+        stderr.write_text("")
+        wes_data = {"run_log": {"stderr": str(stderr)}, "task_logs": [{"stdout": ""}]}
+
+        assert log_paths(wes_data) == [str(stderr)]
+
+    def test_invalid_compression_level(self, tmp_path):
+        """Compression levels outside 0-9 are rejected."""
+        with pytest.raises(ValueError) as exc_info:
+            write_crate_archive(
+                wrroc_data, tmp_path / "crate.zip", compression_level=10
+            )
+
+        assert "The compression level must be between 0 and 9" in str(exc_info.value)
@@ -0,0 +1,118 @@
+"""ASYNC CONVERTER MANAGER UNIT TESTS"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from crategen.async_converter_manager import AsyncConverterManager
+
+
+class TestAsyncConverterManager:
+    """Test suite for the asyncio conversion API."""
+
+    def test_convert(self, make_tes_task):
+        """Single payloads are converted off the event loop thread."""
+
+        async def main():
+            async with AsyncConverterManager(max_workers=1) as manager:
+                tes = await manager.convert_tes_to_wrroc(make_tes_task(0))
+                wes = await manager.convert_wes_to_wrroc({"run_id": "run"})
+            return tes, wes
+
+        tes, wes = asyncio.run(main())
+
+        assert tes["@id"] == "task-0"
+        assert wes["@id"] == "run"
+
+    def test_convert_many(self, make_tes_task):
+        """Results are returned in input order."""
+
+        async def main():
+            async with AsyncConverterManager(max_workers=4) as manager:
+                return await manager.convert_many(
+                    "tes-to-wrroc", [make_tes_task(i) for i in range(20)]
+                )
+
+        results = asyncio.run(main())
+
+        assert [result["@id"] for result in results] == [f"task-{i}" for i in range(20)]
+
+    def test_convert_many_error(self, make_tes_task):
+        """A failing conversion is raised from convert_many."""
+
+        async def main():
+            async with AsyncConverterManager() as manager:
+                await manager.convert_many(
+                    "tes-to-wrroc", [make_tes_task(0), "invalid"]
+                )
+
+        with pytest.raises(ExceptionGroup):
+            asyncio.run(main())
+
+    def test_stream_backpressure(self, make_tes_task):
+        """The stream never pulls more than max_pending items ahead of the consumer."""
+        pulled = []
+
+        async def source():
+            for index in range(10):
+                pulled.append(index)
+                yield make_tes_task(index)
+
+        async def main():
+            results = []
+            async with AsyncConverterManager(max_workers=2, max_pending=3) as manager:
+                async for result in manager.stream("tes-to-wrroc", source()):
+                    assert len(pulled) - len(results) <= manager.max_pending
+                    results.append(result["@id"])
+            return results
+
+        results = asyncio.run(main())
+
+        assert results == [f"task-{i}" for i in range(10)]
+
+    def test_cancellation(self, make_tes_task):
+        """Cancelling a waiting call drops its conversion."""
+        release = threading.Event()
+        started = []
+
+        class BlockingExecutor:
+            """Executor whose first job blocks until released."""
+
+            def __init__(self):
+                self._pool = ThreadPoolExecutor(max_workers=1)
+
+            def submit(self, fn, *args):
+                def run():
+                    started.append(args[1]["id"])
+                    release.wait(5)
+                    return fn(*args)
+
+                return self._pool.submit(run)
+
+            def shutdown(self, *args, **kwargs):
+                self._pool.shutdown()
+
+        async def main():
+            executor = BlockingExecutor()
+            manager = AsyncConverterManager(executor=executor, max_pending=1)
+            first = asyncio.ensure_future(
+                manager.convert_tes_to_wrroc(make_tes_task(0))
+            )
+            second = asyncio.ensure_future(
+                manager.convert_tes_to_wrroc(make_tes_task(1))
+            )
+            await asyncio.sleep(0.05)
+            second.cancel()
+            release.set()
+            result = await first
+            with pytest.raises(asyncio.CancelledError):
+                await second
+            executor.shutdown()
+            return result
+
+        result = asyncio.run(main())
+
+        assert result["@id"] == "task-0"
+        assert started == ["task-0"]
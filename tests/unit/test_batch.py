@@ -0,0 +1,44 @@
+"""BATCH UNIT TESTS"""
+
+import json
+
+import pytest
+
+from crategen.batch import convert_files, output_path_for
+from crategen.compression import open_input, open_output
+
+
+class TestBatch:
+    """Test suite for batch conversion of compressed files."""
+
+    def test_convert_files(self, tmp_path, make_tes_task):
+        """Compressed and plain inputs are converted in parallel."""
+        input_paths = []
+        for index, extension in enumerate(["", ".gz", ".bz2", ".xz"]):
+            path = tmp_path / f"task-{index}.json{extension}"
+            with open_output(path) as file:
+                json.dump(make_tes_task(index), file)
+            input_paths.append(str(path))
+        output_dir = tmp_path / "out"
+
+        output_paths = convert_files(
+            input_paths, output_dir, "tes-to-wrroc", workers=2, extension=".gz"
+        )
+
+        assert output_paths == [
+            str(output_dir / f"task-{index}.json.gz") for index in range(4)
+        ]
+        for index, path in enumerate(output_paths):
+            with open_input(path) as file:
+                assert json.load(file)["@id"] == f"task-{index}"
+
+    def test_duplicate_names(self, tmp_path):
+        """Inputs that map to the same output are rejected."""
+        with pytest.raises(ValueError) as exc_info:
+            convert_files(["a/task.json", "b/task.json.gz"], tmp_path, "tes-to-wrroc")
+
+        assert "distinct names" in str(exc_info.value)
+
+    def test_output_path_for(self):
+        """The compression extension of the input is replaced."""
+        assert output_path_for("in/task.json.xz", "out", ".bz2") == "out/task.json.bz2"
@@ -0,0 +1,250 @@
+"""CHECKPOINT UNIT TESTS"""
+
+import gzip
+import json
+import os
+
+from crategen.batch import JOURNAL_NAME, convert_files
+from crategen.checkpoint import CheckpointJournal, conversion_options
+from crategen.converter_manager import ConverterManager
+from crategen.ndjson import (
+    convert_ndjson,
+    journal_path_for,
+    shard_path,
+    split_ranges,
+)
+
+
+def converted_line(task, fields=None):
+    """Return the NDJSON output line of a converted task."""
+    wrroc = ConverterManager(fields=fields).convert_tes_to_wrroc(task)
+    return json.dumps(wrroc) + "\n"
+
+
+def ndjson_header(input_path, ranges, **options):
+    """Return the journal header of an NDJSON conversion of ``input_path``."""
+    stat = os.stat(input_path)
+    return {
+        "input": os.path.abspath(input_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        **conversion_options("tes-to-wrroc", validate_input=False, **options),
+        "ranges": ranges,
+    }
+
+
+class TestCheckpointJournal:
+    """Test suite for the checkpoint journal."""
+
+    def test_torn_entry_ignored(self, tmp_path):
+        """A partially written last entry is ignored."""
+        path = tmp_path / "journal"
+        with CheckpointJournal(str(path)) as journal:
+            journal.record({"input": "a"})
+            journal.record({"input": "b"}, sync=True)
+        with open(path, "a") as file:
+            file.write('{"input": "c"')
+
+        assert CheckpointJournal(str(path)).read() == [{"input": "a"}, {"input": "b"}]
+
+    def test_missing_journal(self, tmp_path):
+        """A missing journal has no entries."""
+        assert CheckpointJournal(str(tmp_path / "journal")).read() == []
+
+
+class TestResumeNDJSON:
+    """Test suite for resuming NDJSON conversions."""
+
+    def test_resume(self, tmp_path, make_tes_task):
+        """Finished ranges are skipped and unfinished ones continue from their checkpoint."""
+        input_path = tmp_path / "tasks.ndjson"
+        output_path = tmp_path / "crates.ndjson"
+        total = 6
+        input_path.write_text(
+            "".join(json.dumps(make_tes_task(i)) + "\n" for i in range(total))
+        )
+        ranges = split_ranges(input_path, 2)
+        content = input_path.read_bytes()
+        first_line_end = content.index(b"\n", ranges[1][0]) + 1
+        done = content[: ranges[0][1]].count(b"\n")
+
+        # Simulate a run that finished range 0 and checkpointed one record of range 1
+        shard_0 = "already converted\n"
+        shard_1 = converted_line(make_tes_task(done))
+        with CheckpointJournal(journal_path_for(output_path)) as journal:
+            journal.record(ndjson_header(input_path, ranges))
+            journal.record(
+                {
+                    "shard": 0,
+                    "offset": ranges[0][1],
+                    "size": len(shard_0),
+                    "count": done,
+                }
+            )
+            journal.record(
+                {"shard": 1, "offset": first_line_end, "size": len(shard_1), "count": 1}
+            )
+        with open(shard_path(output_path, 0), "w") as file:
+            file.write(shard_0)
+        with open(shard_path(output_path, 1), "w") as file:
+            file.write(shard_1 + "partial record written after the checkpoint")
+
+        count, _ = convert_ndjson(
+            input_path, output_path, "tes-to-wrroc", workers=2, resume=True
+        )
+
+        assert count == total
+        assert output_path.read_text() == shard_0 + "".join(
+            converted_line(make_tes_task(i)) for i in range(done, total)
+        )
+        assert not os.path.exists(journal_path_for(output_path))
+
+    def test_resume_compressed(self, tmp_path, make_tes_task):
+        """A compressed stream continues after its last journaled input line."""
+        input_path = tmp_path / "tasks.ndjson.gz"
+        output_path = tmp_path / "crates.ndjson.gz"
+        total, done = 5, 2
+        with gzip.open(input_path, "wt") as file:
+            file.write(
+                "".join(json.dumps(make_tes_task(i)) + "\n" for i in range(total))
+            )
+
+        # Simulate a run that checkpointed two records, then wrote part of a third
+        written = "already converted\n" * done
+        with CheckpointJournal(journal_path_for(output_path)) as journal:
+            journal.record(ndjson_header(input_path, []))
+            journal.record(
+                {"shard": 0, "line": done, "size": len(written), "count": done}
+            )
+        with open(shard_path(output_path, 0), "w") as file:
+            file.write(written + "partial record written after the checkpoint")
+
+        count, _ = convert_ndjson(input_path, output_path, "tes-to-wrroc", resume=True)
+
+        assert count == total
+        with gzip.open(output_path, "rt") as file:
+            assert file.read() == written + "".join(
+                converted_line(make_tes_task(i)) for i in range(done, total)
+            )
+        assert not os.path.exists(journal_path_for(output_path))
+        assert not os.path.exists(shard_path(output_path, 0))
+
+    def test_checkpoint_compressed(self, tmp_path, monkeypatch, make_tes_task):
+        """A compressed stream journals its progress while converting."""
+        input_path = tmp_path / "tasks.ndjson.gz"
+        output_path = tmp_path / "crates.ndjson"
+        total = 5
+        with gzip.open(input_path, "wt") as file:
+            file.write(
+                "".join(json.dumps(make_tes_task(i)) + "\n" for i in range(total))
+            )
+        entries = []
+        record = CheckpointJournal.record
+        monkeypatch.setattr(
+            CheckpointJournal,
+            "record",
+            lambda journal, entry, sync=False: entries.append(entry)
+            or record(journal, entry, sync),
+        )
+
+        count, _ = convert_ndjson(
+            input_path, output_path, "tes-to-wrroc", checkpoint_every=2
+        )
+
+        assert count == total
+        assert [entry["line"] for entry in entries[1:]] == [2, 4, 5]
+        assert output_path.read_text() == "".join(
+            converted_line(make_tes_task(i)) for i in range(total)
+        )
+
+    def test_changed_input_restarts(self, tmp_path, make_tes_task):
+        """A journal of a different input is discarded."""
+        input_path = tmp_path / "tasks.ndjson"
+        output_path = tmp_path / "crates.ndjson"
+        tasks = [make_tes_task(i) for i in range(4)]
+        input_path.write_text("".join(json.dumps(task) + "\n" for task in tasks))
+        with CheckpointJournal(journal_path_for(output_path)) as journal:
+            journal.record({"input": "other", "size": 1, "mtime_ns": 1, "ranges": []})
+
+        count, _ = convert_ndjson(
+            input_path, output_path, "tes-to-wrroc", workers=2, resume=True
+        )
+
+        assert count == len(tasks)
+        assert output_path.read_text() == "".join(
+            converted_line(task) for task in tasks
+        )
+
+    def test_changed_options_restart(self, tmp_path, make_tes_task):
+        """A journal of a run with other conversion options is discarded."""
+        input_path = tmp_path / "tasks.ndjson"
+        output_path = tmp_path / "crates.ndjson"
+        tasks = [make_tes_task(i) for i in range(4)]
+        input_path.write_text("".join(json.dumps(task) + "\n" for task in tasks))
+        ranges = split_ranges(input_path, 1)
+        with CheckpointJournal(journal_path_for(output_path)) as journal:
+            journal.record(ndjson_header(input_path, ranges))
+            journal.record({"shard": 0, "offset": ranges[0][1], "size": 0, "count": 4})
+        with open(shard_path(output_path, 0), "w") as file:
+            file.write("full records of the earlier run\n")
+
+        count, _ = convert_ndjson(
+            input_path,
+            output_path,
+            "tes-to-wrroc",
+            workers=1,
+            resume=True,
+            fields=["@id"],
+        )
+
+        assert count == len(tasks)
+        assert output_path.read_text() == "".join(
+            converted_line(task, fields=["@id"]) for task in tasks
+        )
+
+
+class TestResumeBatch:
+    """Test suite for resuming batch conversions."""
+
+    def test_resume(self, tmp_path, make_tes_task):
+        """Journaled inputs are skipped without being read."""
+        input_paths = []
+        for index in range(3):
+            path = tmp_path / f"task-{index}.json"
+            path.write_text(json.dumps(make_tes_task(index)))
+            input_paths.append(str(path))
+        output_dir = tmp_path / "out"
+        output_dir.mkdir()
+        (output_dir / "task-0.json").write_text("already converted")
+        with CheckpointJournal(str(output_dir / JOURNAL_NAME)) as journal:
+            journal.record({"options": conversion_options("tes-to-wrroc")})
+            journal.record({"input": os.path.abspath(input_paths[0])})
+        os.remove(input_paths[0])
+
+        output_paths = convert_files(
+            input_paths, str(output_dir), "tes-to-wrroc", workers=2, resume=True
+        )
+
+        assert (output_dir / "task-0.json").read_text() == "already converted"
+        with open(output_paths[2]) as file:
+            assert json.load(file)["@id"] == "task-2"
+        assert not (output_dir / JOURNAL_NAME).exists()
+        assert not list(output_dir.glob(".tmp-*"))
+
+    def test_changed_options_restart(self, tmp_path, make_tes_task):
+        """Journaled inputs are converted again if the options changed."""
+        path = tmp_path / "task-0.json"
+        path.write_text(json.dumps(make_tes_task(0)))
+        output_dir = tmp_path / "out"
+        output_dir.mkdir()
+        (output_dir / "task-0.json").write_text("converted with all fields")
+        with CheckpointJournal(str(output_dir / JOURNAL_NAME)) as journal:
+            journal.record({"options": conversion_options("tes-to-wrroc")})
+            journal.record({"input": os.path.abspath(path)})
+
+        convert_files(
+            [str(path)], str(output_dir), "tes-to-wrroc", resume=True, fields=["@id"]
+        )
+
+        with open(output_dir / "task-0.json") as file:
+            assert json.load(file) == {"@id": "task-0"}
@@ -0,0 +1,284 @@
+"""CLI UNIT TESTS"""
+
+import json
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from crategen.cli import cli
+
+
+@pytest.fixture
+def runner():
+    """Click test runner."""
+    return CliRunner()
+
+
+@pytest.fixture
+def task_file(tmp_path, tes_task):
+    """A TES task JSON file."""
+    path = tmp_path / "task.json"
+    path.write_text(json.dumps(tes_task))
+    return str(path)
+
+
+@pytest.fixture
+def tasks_file(tmp_path, tes_task):
+    """An NDJSON file with three TES tasks."""
+    path = tmp_path / "tasks.ndjson"
+    path.write_text(
+        "".join(json.dumps({**tes_task, "id": f"task-{i}"}) + "\n" for i in range(3))
+    )
+    return str(path)
+
+
+def invoke(runner, args):
+    """Invoke the CLI and fail with its output if it does not succeed."""
+    result = runner.invoke(cli, args, catch_exceptions=False)
+    assert result.exit_code == 0, result.output
+    return result
+
+
+class TestDefaultCommand:
+    """Test suite for running ``convert`` without a subcommand."""
+
+    def test_legacy_invocation(self, runner, task_file, tmp_path):
+        """``crategen --input ... --output ...`` still converts a file."""
+        output = tmp_path / "crate.json"
+
+        invoke(
+            runner,
+            [
+                "--input",
+                task_file,
+                "--output",
+                str(output),
+                "--conversion-type",
+                "tes-to-wrroc",
+            ],
+        )
+
+        assert json.loads(output.read_text())["@id"] == "task-id"
+
+    def test_explicit_convert(self, runner, task_file, tmp_path):
+        """The convert subcommand can be named explicitly."""
+        output = tmp_path / "crate.json.gz"
+
+        invoke(
+            runner,
+            [
+                "convert",
+                "--input",
+                task_file,
+                "--output",
+                str(output),
+                "--conversion-type",
+                "tes-to-wrroc",
+            ],
+        )
+
+        assert output.read_bytes()[:2] == b"\x1f\x8b"
+
+    def test_help_lists_subcommands(self, runner):
+        """Group help is shown instead of running the default command."""
+        result = invoke(runner, ["--help"])
+
+        for command in ("convert", "ndjson", "batch", "index", "query", "merge"):
+            assert command in result.output
+
+
+class TestSubcommands:
+    """Test suite for the subcommands."""
+
+    def test_ndjson(self, runner, tasks_file, tmp_path):
+        """NDJSON records are converted in input order."""
+        output = tmp_path / "crates.ndjson"
+
+        invoke(
+            runner,
+            [
+                "ndjson",
+                "--input",
+                tasks_file,
+                "--output",
+                str(output),
+                "--conversion-type",
+                "tes-to-wrroc",
+                "--workers",
+                "2",
+            ],
+        )
+
+        lines = output.read_text().splitlines()
+        assert [json.loads(line)["@id"] for line in lines] == [
+            "task-0",
+            "task-1",
+            "task-2",
+        ]
+
+    def test_batch(self, runner, task_file, tmp_path):
+        """Files are converted into the output directory."""
+        output_dir = tmp_path / "out"
+
+        invoke(
+            runner,
+            [
+                "batch",
+                task_file,
+                "--output-dir",
+                str(output_dir),
+                "--conversion-type",
+                "tes-to-wrroc",
+                "--fields",
+                "@id,status",
+            ],
+        )
+
+        assert json.loads((output_dir / "task.json").read_text()) == {
+            "@id": "task-id",
+            "status": "COMPLETE",
+        }
+
+    def test_index_and_query(self, runner, tasks_file, tmp_path):
+        """Indexed entities can be queried as NDJSON."""
+        output = tmp_path / "crates.ndjson"
+        database = str(tmp_path / "crates.sqlite")
+        invoke(
+            runner,
+            [
+                "ndjson",
+                "--input",
+                tasks_file,
+                "--output",
+                str(output),
+                "--conversion-type",
+                "tes-to-wrroc",
+            ],
+        )
+
+        invoke(runner, ["index", database, str(output)])
+        result = invoke(runner, ["query", database, "--id", "task-1"])
+
+        assert [json.loads(line)["@id"] for line in result.output.splitlines()] == [
+            "task-1"
+        ]
+
+    def test_index_skips_unparsable_files(self, runner, tmp_path):
+        """Unparsable files are listed without aborting the ingest."""
+        crates = tmp_path / "crates"
+        crates.mkdir()
+        (crates / "good.json").write_text(json.dumps({"@id": "a"}))
+        (crates / "bad.json").write_text("not json")
+
+        result = invoke(runner, ["index", str(tmp_path / "crates.sqlite"), str(crates)])
+
+        assert "Indexed 1 entities" in result.output
+        assert "Skipped 1 unreadable files" in result.output
+
+    def test_merge(self, runner, tmp_path):
+        """Crates are merged into one deduplicated graph."""
+        first = tmp_path / "first.json"
+        second = tmp_path / "second.json"
+        first.write_text(json.dumps({"@id": "a", "name": "old"}))
+        second.write_text(json.dumps([{"@id": "a", "name": "new"}, {"@id": "b"}]))
+        output = tmp_path / "merged.json"
+
+        result = invoke(
+            runner, ["merge", str(first), str(second), "--output", str(output)]
+        )
+
+        assert result.output.startswith("Merged ")
+        graph = json.loads(output.read_text())["@graph"]
+        assert {"@id": "a", "name": "new"} in graph
+
+    def test_check(self, runner, task_file, tmp_path):
+        """Invalid records are reported with a non-zero exit status."""
+        valid = tmp_path / "crate.json"
+        invoke(
+            runner,
+            [
+                "--input",
+                task_file,
+                "--output",
+                str(valid),
+                "--conversion-type",
+                "tes-to-wrroc",
+            ],
+        )
+        invalid = tmp_path / "invalid.ndjson"
+        invalid.write_text('{"@id": ""}\n{"@id": \n')
+
+        invoke(runner, ["check", str(valid), "--assume-type", "CreateAction"])
+        untyped = runner.invoke(cli, ["check", str(valid)])
+        result = runner.invoke(cli, ["check", str(invalid)])
+
+        assert untyped.exit_code == 1
+        assert "task-id: @type: is required" in untyped.output
+        assert result.exit_code == 1
+        assert "invalid.ndjson:1: @id: must be a non-empty string" in result.output
+        assert "invalid.ndjson:2: is not valid JSON" in result.output
+        assert "Checked 2 of 2 records, 2 invalid" in result.output
+
+
+class TestFieldsOption:
+    """Test suite for checking --fields while parsing the command line."""
+
+    def test_unsupported_field(self, runner, task_file, tmp_path):
+        """Fields the conversion type cannot compute are a usage error."""
+        result = runner.invoke(
+            cli,
+            [
+                "--input",
+                task_file,
+                "--output",
+                str(tmp_path / "crate.json"),
+                "--conversion-type",
+                "wes-to-wrroc",
+                "--fields",
+                "@id,object",
+            ],
+        )
+
+        assert result.exit_code == click.UsageError.exit_code
+        assert "unsupported WRROC fields for wes-to-wrroc: object" in result.output
+        assert not (tmp_path / "crate.json").exists()
+
+    def test_unsupported_field_in_workers(self, runner, tasks_file, tmp_path):
+        """Batch and NDJSON commands reject fields before starting workers."""
+        result = runner.invoke(
+            cli,
+            [
+                "ndjson",
+                "--input",
+                tasks_file,
+                "--output",
+                str(tmp_path / "crates.ndjson"),
+                "--conversion-type",
+                "tes-to-wrroc",
+                "--fields",
+                "bogus",
+            ],
+        )
+
+        assert result.exit_code == click.UsageError.exit_code
+        assert "Invalid value for '--fields'" in result.output
+
+    def test_empty_fields(self, runner, task_file, tmp_path):
+        """An empty field list is rejected instead of writing empty objects."""
+        result = runner.invoke(
+            cli,
+            [
+                "batch",
+                task_file,
+                "--output-dir",
+                str(tmp_path / "out"),
+                "--conversion-type",
+                "tes-to-wrroc",
+                "--fields",
+                " , ",
+            ],
+        )
+
+        assert result.exit_code == click.UsageError.exit_code
+        assert "must name at least one WRROC property" in result.output
@@ -0,0 +1,158 @@
+"""COMPACT MODELS UNIT TESTS"""
+
+import pytest
+from pydantic import AnyUrl, ValidationError
+
+from crategen.converters.tes_converter import TESConverter
+from crategen.models import TESData, TESInputRow, TESOutputFileLogRow, compact_task
+
+test_url = "https://example.com/file.txt"
+
+tes_task = {
+    "id": "task-id",
+    "state": "COMPLETE",
+    "executors": [{"image": "ubuntu:20.04", "command": ["echo"]}],
+    "inputs": [
+        {"url": test_url, "path": "/data/in-1"},
+        {"content": "inline", "path": "/data/in-2", "type": "FILE"},
+    ],
+    "outputs": [{"url": test_url, "path": "/data/out"}],
+    "creation_time": "2020-10-02T16:00:00.000Z",
+    "logs": [
+        {
+            "start_time": "2020-10-02T16:00:00.000Z",
+            "end_time": "2020-10-02T17:00:00.000Z",
+            "logs": [{"exit_code": 0}],
+            "outputs": [{"url": test_url, "path": "/data/out", "size_bytes": "10"}],
+        }
+    ],
+}
+
+
+class TestCompactTask:
+    """Test suite for compact storage of validated TES tasks."""
+
+    def test_rows(self):
+        """Record collections are stored as slotted rows with plain values."""
+        task = compact_task(tes_task)
+
+        assert task["state"] == "COMPLETE"
+        assert task["inputs"][0] == TESInputRow(
+            None, None, test_url, "/data/in-1", None, None
+        )
+        assert task["inputs"][1].type == "FILE"
+        assert not isinstance(task["inputs"][0].url, AnyUrl)
+        assert task["inputs"][1].url is None
+        assert task["logs"][0]["outputs"] == (
+            TESOutputFileLogRow(test_url, "/data/out", "10"),
+        )
+        assert task["logs"][0]["logs"][0].exit_code == 0
+        assert not hasattr(task["inputs"][0], "__dict__")
+
+    def test_row_get(self):
+        """Rows behave like dicts for unset and unknown fields."""
+        row = compact_task(tes_task)["inputs"][1]
+
+        assert row.get("path") == "/data/in-2"
+        assert row.get("url", "") == ""
+        assert row.get("unknown", "default") == "default"
+
+    def test_row_get_ignores_tuple_attributes(self):
+        """Tuple methods and model defaults are not returned as field values."""
+        row = compact_task(tes_task)["inputs"][0]
+
+        assert row.get("count") is None
+        assert row.get("index", "default") == "default"
+        assert row.get("type", "unset") == "unset"
+
+    def test_converter_consumes_rows(self):
+        """Converting a compact task gives the same result as the raw task."""
+        converter = TESConverter()
+
+        compact = converter.convert_to_wrroc(compact_task(tes_task))
+        raw = converter.convert_to_wrroc(tes_task)
+
+        assert compact == raw
+
+    @pytest.mark.parametrize(
+        "key,value",
+        [
+            ("inputs", [{"url": test_url, "path": "relative"}]),
+            ("outputs", [{"url": test_url, "path": "/out*"}]),
+            ("creation_time", "yesterday"),
+        ],
+    )
+    def test_validation(self, key, value):
+        """Every record is validated with its pydantic model."""
+        with pytest.raises(ValidationError):
+            compact_task({**tes_task, key: value})
+
+
+times = {
+    "start_time": "2020-10-02T16:00:00.000Z",
+    "end_time": "2020-10-02T17:00:00.000Z",
+}
+
+
+def accepts(validate, task):
+    """Return whether ``validate`` accepts the task."""
+    try:
+        validate(task)
+    except ValidationError:
+        return False
+    return True
+
+
+class TestCollectionShapes:
+    """Test suite for accepting and rejecting tasks exactly like ``TESData``."""
+
+    @pytest.mark.parametrize(
+        "key,value",
+        [
+            ("inputs", None),
+            ("inputs", ({"url": test_url, "path": "/in"},)),
+            ("inputs", "not a list"),
+            ("inputs", ["not a record"]),
+            ("outputs", {"url": test_url, "path": "/out"}),
+            ("logs", [{"logs": [], "outputs": [], **times}]),
+            ("logs", [{"end_time": "2020-10-02T17:00:00.000Z"}]),
+            ("logs", [{"logs": None, "outputs": []}]),
+            ("logs", [{"logs": [{}], "outputs": [], **times}]),
+            ("logs", ["not a record"]),
+            ("logs", [{"logs": "not a list", "outputs": []}]),
+        ],
+    )
+    def test_matches_tes_data(self, key, value):
+        """Collections are accepted or rejected as ``TESData`` would."""
+        task = {**tes_task, key: value}
+
+        assert accepts(compact_task, task) == accepts(lambda t: TESData(**t), task)
+
+    @pytest.mark.parametrize(
+        "key,value,loc",
+        [
+            ("inputs", ["not a record"], ("inputs", 0)),
+            ("outputs", "not a list", ("outputs",)),
+            (
+                "logs",
+                [{"logs": [], "outputs": [], **times}, {"logs": [], **times}],
+                ("logs", 1, "outputs"),
+            ),
+            (
+                "logs",
+                [{"logs": [{"exit_code": 0}, {}], "outputs": [], **times}],
+                ("logs", 0, "logs", 1, "exit_code"),
+            ),
+        ],
+    )
+    def test_error_location(self, key, value, loc):
+        """Errors are pydantic errors located at the invalid item."""
+        with pytest.raises(ValidationError) as exc_info:
+            compact_task({**tes_task, key: value})
+
+        assert exc_info.value.errors()[0]["loc"] == loc
+
+    def test_record_must_be_an_object(self):
+        """A task that is not a JSON object is a ValueError, not a TypeError."""
+        with pytest.raises(ValueError):
+            compact_task(["not", "a", "task"])
@@ -0,0 +1,56 @@
+"""COMPRESSION UNIT TESTS"""
+
+
+import pytest
+
+from crategen.compression import (
+    detect_compression,
+    open_input,
+    open_output,
+    strip_compression_extension,
+)
+
+extensions = [(".gz", "gzip"), (".bz2", "bz2"), (".xz", "lzma")]
+
+
+class TestCompression:
+    """Test suite for transparent compression."""
+
+    @pytest.mark.parametrize("extension,compression", extensions)
+    def test_round_trip(self, tmp_path, extension, compression):
+        """Output compressed by extension is detected and read back."""
+        path = tmp_path / f"data.json{extension}"
+        with open_output(path) as file:
+            file.write("content")
+
+        assert detect_compression(path) == compression
+        with open_input(path) as file:
+            assert file.read() == "content"
+
+    def test_detect_by_magic_bytes(self, tmp_path):
+        """Detection relies on content, not on the file name."""
+        path = tmp_path / "data.gz"
+        with open_output(path) as file:
+            file.write("content")
+        renamed = path.rename(tmp_path / "data.json")
+
+        assert detect_compression(renamed) == "gzip"
+        with open_input(renamed) as file:
+            assert file.read() == "content"
+
+    def test_uncompressed(self, tmp_path):
+        """Plain files are read and written as is."""
+        path = tmp_path / "data.json"
+        with open_output(path) as file:
+            file.write("content")
+
+        assert detect_compression(path) is None
+        assert path.read_text() == "content"
+
+    @pytest.mark.parametrize(
+        "path,expected",
+        [("a/data.json.gz", "a/data.json"), ("data.json", "data.json")],
+    )
+    def test_strip_compression_extension(self, path, expected):
+        """Only compression extensions are stripped."""
+        assert strip_compression_extension(path) == expected
@@ -0,0 +1,165 @@
+"""CONVERTER UNIT TESTS"""
+
+import pytest
+
+from crategen.converter_manager import ConverterManager
+from crategen.converters.tes_converter import TESConverter
+from crategen.converters.utils import convert_to_iso8601
+from crategen.converters.wes_converter import WESConverter
+from crategen.ndjson import input_validator
+
+
+class GuardedDict(dict):
+    """Dict that fails when one of the guarded keys is read."""
+
+    def __init__(self, data, guarded):
+        super().__init__(data)
+        self.guarded = guarded
+
+    def get(self, key, default=None):
+        assert key not in self.guarded, f"'{key}' should not be read"
+        return super().get(key, default)
+
+
+class TestFieldProjection:
+    """Test suite for computing only the requested WRROC fields."""
+
+    fields = ("@id", "status", "startTime", "endTime")
+
+    def test_tes_projection(self, tes_task):
+        """Only the requested fields are computed, in output order."""
+        data = GuardedDict(tes_task, guarded={"inputs", "outputs", "executors"})
+
+        wrroc = TESConverter().convert_to_wrroc(data, fields=reversed(self.fields))
+
+        assert wrroc == {
+            "@id": "task-id",
+            "status": "COMPLETE",
+            "startTime": "2020-10-02T16:00:00Z",
+            "endTime": "2020-10-02T17:00:00Z",
+        }
+        assert list(wrroc) == list(self.fields)
+
+    def test_wes_projection(self, wes_run):
+        """Unrequested WES subtrees are not read."""
+        data = GuardedDict(wes_run, guarded={"outputs", "run_log"})
+
+        wrroc = WESConverter().convert_to_wrroc(data, fields=("@id", "status"))
+
+        assert wrroc == {"@id": "run-id", "status": "COMPLETE"}
+
+    def test_all_fields_by_default(self, tes_task):
+        """Without a projection the full WRROC data is computed."""
+        full = TESConverter().convert_to_wrroc(tes_task)
+
+        assert set(full) == {
+            "@id",
+            "name",
+            "description",
+            "instrument",
+            "status",
+            "object",
+            "result",
+            "startTime",
+            "endTime",
+        }
+
+    def test_manager_fields(self, tes_task, wes_run):
+        """The manager applies its projection to every conversion."""
+        manager = ConverterManager(fields=["@id"])
+
+        assert manager.convert("tes-to-wrroc", tes_task) == {"@id": "task-id"}
+        assert manager.convert("wes-to-wrroc", wes_run) == {"@id": "run-id"}
+
+    def test_input_validation_projection(self, tes_task):
+        """Unrequested TES collections are not read by input validation."""
+        task = {
+            **tes_task,
+            "executors": [{"image": "ubuntu:20.04", "command": ["true"]}],
+        }
+        data = GuardedDict(task, guarded={"inputs", "outputs", "logs"})
+        validate = input_validator("tes-to-wrroc", True, fields=self.fields[:3])
+
+        task = validate(data)
+
+        assert "inputs" not in task
+        assert TESConverter().convert_to_wrroc(task, fields=self.fields[:3]) == {
+            "@id": "task-id",
+            "status": "COMPLETE",
+            "startTime": "2020-10-02T16:00:00Z",
+        }
+
+    def test_input_validation_reads_requested_collections(self, tes_task):
+        """Collections read by a requested field are still validated."""
+        validate = input_validator("tes-to-wrroc", True, fields=("@id", "object"))
+
+        task = validate(
+            {
+                **tes_task,
+                "executors": [{"image": "ubuntu:20.04", "command": ["true"]}],
+                "outputs": "not validated",
+            }
+        )
+
+        assert task["inputs"][0].path == "/data/input"
+        assert "outputs" not in task
+
+    def test_unknown_field(self, tes_task):
+        """Unsupported fields are rejected."""
+        with pytest.raises(ValueError) as exc_info:
+            TESConverter().convert_to_wrroc(tes_task, fields=["@id", "bogus"])
+
+        assert "Unsupported WRROC fields: bogus" in str(exc_info.value)
+
+
+class TestTimestamps:
+    """Test suite for normalizing timestamps to UTC."""
+
+    @pytest.mark.parametrize(
+        "timestamp,expected",
+        [
+            ("2020-10-02T17:00:00+02:00", "2020-10-02T15:00:00Z"),
+            ("2020-10-02T17:00:00.5-01:30", "2020-10-02T18:30:00.500000Z"),
+            ("2020-10-02T17:00:00+0000", "2020-10-02T17:00:00Z"),
+            ("2020-10-02T17:00:00Z", "2020-10-02T17:00:00Z"),
+            ("2020-10-02", None),
+        ],
+    )
+    def test_convert_to_iso8601(self, timestamp, expected):
+        """Timestamps with a UTC offset are converted to UTC with a Z suffix."""
+        assert convert_to_iso8601(timestamp) == expected
+
+    def test_tes_end_time_with_offset(self, tes_task):
+        """TES times with a UTC offset become UTC WRROC times."""
+        task = {**tes_task, "logs": [{"end_time": "2020-10-03T01:00:00+08:00"}]}
+
+        wrroc = TESConverter().convert_to_wrroc(task, fields=("endTime",))
+
+        assert wrroc == {"endTime": "2020-10-02T17:00:00Z"}
+
+
+class TestWESInstrument:
+    """Test suite for the workflow of a WES run."""
+
+    workflow_url = "https://example.org/workflow.cwl"
+
+    def test_instrument_from_workflow_url(self, wes_run):
+        """The workflow URL of the run request is the instrument."""
+        run = {**wes_run, "request": {"workflow_url": self.workflow_url}}
+
+        wrroc = WESConverter().convert_to_wrroc(run)
+
+        assert wrroc["instrument"] == self.workflow_url
+
+    def test_missing_request(self, wes_run):
+        """Runs without a request have no instrument."""
+        assert WESConverter().convert_to_wrroc(wes_run)["instrument"] is None
+
+    def test_round_trip(self, wes_run):
+        """The instrument is converted back to the workflow URL."""
+        converter = WESConverter()
+        run = {**wes_run, "request": {"workflow_url": self.workflow_url}}
+
+        wes_data = converter.convert_from_wrroc(converter.convert_to_wrroc(run))
+
+        assert wes_data["request"] == {"workflow_url": self.workflow_url}
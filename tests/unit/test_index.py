@@ -0,0 +1,186 @@
+"""INDEX UNIT TESTS"""
+
+import json
+import os
+
+import pytest
+
+from crategen.compression import open_output
+from crategen.converter_manager import ConverterManager
+from crategen.index import CrateIndex, to_epoch
+
+
+@pytest.fixture
+def crate_dir(tmp_path, make_tes_task):
+    """Write converted crates as plain JSON, compressed NDJSON and an @graph document."""
+    manager = ConverterManager()
+    crates = tmp_path / "crates"
+    crates.mkdir()
+    with open(crates / "task-0.json", "w") as file:
+        json.dump(manager.convert_tes_to_wrroc(make_tes_task(0)), file)
+    with open_output(crates / "tasks.ndjson.gz") as file:
+        for index, state in [(1, "EXECUTOR_ERROR"), (2, "EXECUTOR_ERROR")]:
+            wrroc = manager.convert_tes_to_wrroc(
+                make_tes_task(index, state, "python:3.11")
+            )
+            file.write(json.dumps(wrroc) + "\n")
+    with open(crates / "crate.json", "w") as file:
+        json.dump(
+            {
+                "@graph": [
+                    {"@id": "./", "@type": "Dataset"},
+                    {
+                        "@id": "#run",
+                        "@type": ["CreateAction", "Thing"],
+                        "instrument": {"@id": "workflow.cwl"},
+                        "result": [{"@id": "s3://bucket/shared-output"}],
+                    },
+                ]
+            },
+            file,
+        )
+    (crates / "notes.txt").write_text("not a crate")
+    return crates
+
+
+class TestCrateIndex:
+    """Test suite for the SQLite crate index."""
+
+    def test_queries(self, tmp_path, crate_dir):
+        """Entities can be looked up by every indexed property."""
+        expected_entities = 5
+        with CrateIndex(str(tmp_path / "index.sqlite")) as index:
+            assert index.add_tree(str(crate_dir)) == expected_entities
+
+            def ids(**criteria):
+                return [entity["@id"] for entity in index.query(**criteria)]
+
+            assert ids(instrument="python:3.11") == ["task-1", "task-2"]
+            assert ids(status="EXECUTOR_ERROR", since="2024-10-12") == ["task-2"]
+            assert ids(until="2024-10-11") == ["task-0"]
+            assert ids(url="s3://bucket/input-1") == ["task-1"]
+            assert sorted(ids(url="s3://bucket/shared-output")) == [
+                "#run",
+                "task-0",
+                "task-1",
+                "task-2",
+            ]
+            assert ids(entity_type="CreateAction") == ["#run"]
+            assert ids(entity_id="#run", instrument="workflow.cwl") == ["#run"]
+            assert ids(limit=2) == ["./", "#run"]
+            assert index.query(entity_id="#run")[0]["@type"] == [
+                "CreateAction",
+                "Thing",
+            ]
+
+    def test_reingest(self, tmp_path, crate_dir, make_tes_task):
+        """Unchanged files are skipped and changed files replace their entries."""
+        path = crate_dir / "task-0.json"
+        with CrateIndex(str(tmp_path / "index.sqlite")) as index:
+            assert index.add(str(path)) == 1
+            assert index.add(str(path)) == 0
+
+            wrroc = ConverterManager().convert_tes_to_wrroc(make_tes_task(9))
+            path.write_text(json.dumps(wrroc) + "  ")
+            os.utime(path, ns=(0, 0))
+
+            assert index.add(str(path)) == 1
+            assert [entity["@id"] for entity in index.query()] == ["task-9"]
+
+    def test_time_range_across_offsets(self, tmp_path):
+        """Time ranges compare instants, not timestamp strings."""
+        path = tmp_path / "crates.ndjson"
+        entities = [
+            {"@id": "offset", "startTime": "2024-10-10T17:00:00+02:00"},
+            {"@id": "legacy", "startTime": "2024-10-10T15:30:00+00:00Z"},
+            {"@id": "utc", "startTime": "2024-10-10T15:45:00.5Z"},
+        ]
+        path.write_text("".join(json.dumps(entity) + "\n" for entity in entities))
+
+        with CrateIndex(str(tmp_path / "index.sqlite")) as index:
+            index.add(str(path))
+
+            def ids(**criteria):
+                return [entity["@id"] for entity in index.query(**criteria)]
+
+            assert ids() == ["offset", "legacy", "utc"]
+            assert ids(since="2024-10-10T15:30:00Z") == ["legacy", "utc"]
+            assert ids(until="2024-10-10T17:31:00+02:00") == ["offset", "legacy"]
+            with pytest.raises(ValueError) as exc_info:
+                index.query(since="yesterday")
+
+        assert "'since' must be an ISO 8601 time" in str(exc_info.value)
+
+    def test_to_epoch(self):
+        """Naive times and plain dates are UTC, invalid times are None."""
+        assert to_epoch("1970-01-02") == to_epoch("1970-01-02T02:00:00+02:00")
+        assert to_epoch("1970-01-01T00:00:00+00:00Z") == 0
+        assert to_epoch("not a time") is None
+
+    def test_deleted_files_are_pruned(self, tmp_path, crate_dir):
+        """Entries of files deleted from disk are removed."""
+        with CrateIndex(str(tmp_path / "index.sqlite")) as index:
+            index.add_tree(str(crate_dir))
+            (crate_dir / "task-0.json").unlink()
+
+            index.add_tree(str(crate_dir))
+            assert index.query(entity_id="task-0") == []
+
+            (crate_dir / "crate.json").unlink()
+            assert index.prune() == 1
+            assert index.query(entity_id="#run") == []
+
+    def test_non_scalar_values(self, tmp_path):
+        """Reference lists are indexed per item and other values are skipped."""
+        path = tmp_path / "crate.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "@id": 5,
+                    "@type": ["CreateAction", {"bogus": 1}],
+                    "instrument": [{"@id": "workflow.cwl"}, "ubuntu:20.04"],
+                    "status": ["COMPLETE"],
+                    "startTime": 1,
+                    "result": [{"@id": "s3://bucket/out"}, {"@id": ["nested"]}],
+                }
+            )
+        )
+
+        with CrateIndex(str(tmp_path / "index.sqlite")) as index:
+            assert index.add(str(path)) == 1
+            [entity] = index.query(instrument="ubuntu:20.04")
+            assert index.query(url="s3://bucket/out") == [entity]
+
+        assert entity["@id"] == "5"
+        assert entity["@type"] == ["CreateAction"]
+        assert entity["instrument"] == ["workflow.cwl", "ubuntu:20.04"]
+        assert entity["status"] is None
+        assert entity["startTime"] is None
+
+    def test_unparsable_files_are_skipped(self, tmp_path, crate_dir):
+        """Unreadable files are reported and the rest of the tree is indexed."""
+        (crate_dir / "broken.json").write_text('{"@id": ')
+        (crate_dir / "truncated.ndjson.gz").write_bytes(b"\x1f\x8b\x08\x00")
+        expected_entities = 5
+        skipped = []
+
+        with CrateIndex(str(tmp_path / "index.sqlite")) as index:
+            assert index.add_tree(str(crate_dir), skipped=skipped) == expected_entities
+            with pytest.raises(ValueError):
+                index.add_tree(str(crate_dir / "broken.json"))
+
+        assert [os.path.basename(path) for path, _ in skipped] == [
+            "broken.json",
+            "truncated.ndjson.gz",
+        ]
+
+    def test_old_schema_is_rebuilt(self, tmp_path, crate_dir):
+        """An index with another schema version is dropped and recreated."""
+        database = str(tmp_path / "index.sqlite")
+        with CrateIndex(database) as index:
+            index.add(str(crate_dir / "task-0.json"))
+            index._connection.execute("PRAGMA user_version = 1")
+
+        with CrateIndex(database) as index:
+            assert index.query() == []
+            assert index.add(str(crate_dir / "task-0.json")) == 1
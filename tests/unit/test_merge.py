@@ -0,0 +1,249 @@
+"""MERGE UNIT TESTS"""
+
+import json
+
+import pytest
+
+from crategen import merge
+from crategen.compression import open_input, open_output
+from crategen.merge import merge_crates, merge_entities
+from crategen.validation import ProfileValidator
+
+descriptor = {
+    "@id": "ro-crate-metadata.json",
+    "@type": "CreativeWork",
+    "conformsTo": {"@id": "https://w3id.org/ro/crate/1.1"},
+    "about": {"@id": "./"},
+}
+
+
+def write_crate(path, entities):
+    """Write entities as an RO-Crate @graph document."""
+    with open_output(path) as file:
+        json.dump({"@graph": entities}, file)
+    return str(path)
+
+
+def read_graph(file):
+    """Load a merged crate and return its @graph without the root's datePublished."""
+    graph = json.load(file)["@graph"]
+    assert graph[-1].pop("datePublished")
+    return graph
+
+
+class TestMergeEntities:
+    """Test suite for deterministic conflict resolution."""
+
+    def test_later_scalar_wins(self):
+        """Later values replace earlier ones."""
+        merged = merge_entities(
+            {"@id": "a", "name": "old"}, {"@id": "a", "name": "new"}
+        )
+
+        assert merged == {"@id": "a", "name": "new"}
+
+    def test_empty_values_do_not_override(self):
+        """Empty values never replace non-empty ones."""
+        merged = merge_entities(
+            {"@id": "a", "name": "kept", "endTime": None},
+            {"@id": "a", "name": "", "endTime": "2024-10-15T18:14:34Z"},
+        )
+
+        assert merged == {"@id": "a", "name": "kept", "endTime": "2024-10-15T18:14:34Z"}
+
+    def test_lists_and_types_are_unioned(self):
+        """List properties and @type are unioned without duplicates."""
+        merged = merge_entities(
+            {"@id": "a", "@type": "File", "result": [{"@id": "x"}]},
+            {
+                "@id": "a",
+                "@type": ["File", "Dataset"],
+                "result": [{"@id": "x"}, {"@id": "y"}],
+            },
+        )
+
+        assert merged["@type"] == ["File", "Dataset"]
+        assert merged["result"] == [{"@id": "x"}, {"@id": "y"}]
+
+
+class TestMergeCrates:
+    """Test suite for external-memory crate merging."""
+
+    @pytest.mark.parametrize("max_entities", [1, 2, 1000])
+    def test_merge(self, tmp_path, max_entities):
+        """Entities are deduplicated and sorted regardless of the spill size."""
+        first = write_crate(
+            tmp_path / "first.json",
+            [
+                {"@id": "./", "@type": "Dataset", "hasPart": [{"@id": "out.txt"}]},
+                {"@id": "#task-1", "status": "RUNNING", "name": "task"},
+                {"@id": "out.txt", "@type": "File"},
+            ],
+        )
+        second = write_crate(
+            tmp_path / "second.json.gz",
+            [
+                {"@id": "#task-1", "status": "COMPLETE"},
+                {"@id": "./", "hasPart": [{"@id": "log.txt"}]},
+                {"@id": "#task-2", "status": "COMPLETE"},
+            ],
+        )
+        output = tmp_path / "merged.json"
+
+        count = merge_crates(
+            [first, second], str(output), max_entities=max_entities, max_open_runs=2
+        )
+
+        with open(output) as file:
+            graph = read_graph(file)
+        assert count == len(graph) - 2
+        assert graph == [
+            {"@id": "#task-1", "status": "COMPLETE", "name": "task"},
+            {"@id": "#task-2", "status": "COMPLETE"},
+            {"@id": "out.txt", "@type": "File"},
+            descriptor,
+            {
+                "@id": "./",
+                "@type": "Dataset",
+                "hasPart": [
+                    {"@id": "#task-1"},
+                    {"@id": "#task-2"},
+                    {"@id": "log.txt"},
+                    {"@id": "out.txt"},
+                ],
+            },
+        ]
+
+    def test_root_parts_are_not_unioned(self, tmp_path, monkeypatch):
+        """The hasPart lists of many input roots are deduplicated by the sort."""
+        crates, parts = 50, 4
+        paths = [
+            write_crate(
+                tmp_path / f"crate-{index}.json",
+                [
+                    {
+                        "@id": "./",
+                        "@type": "Dataset",
+                        "hasPart": [
+                            {"@id": f"#task-{index}-{part}"} for part in range(parts)
+                        ]
+                        + ["shared.txt"],
+                    },
+                    *({"@id": f"#task-{index}-{part}"} for part in range(parts)),
+                ],
+            )
+            for index in range(crates)
+        ]
+        serialized = []
+        value_key = merge._value_key
+        monkeypatch.setattr(
+            merge,
+            "_value_key",
+            lambda value: serialized.append(value) or value_key(value),
+        )
+        output = tmp_path / "merged.json"
+
+        assert merge_crates(paths, str(output), max_entities=64) == crates * parts
+
+        with open(output) as file:
+            root = read_graph(file)[-1]
+        assert len(root["hasPart"]) == crates * parts + 1
+        assert {"@id": "shared.txt"} in root["hasPart"]
+        assert serialized == []
+
+    def test_lists_are_unioned_incrementally(self, tmp_path, monkeypatch):
+        """Each list value is serialized once, however many inputs add to it."""
+        crates = 50
+        paths = [
+            write_crate(
+                tmp_path / f"crate-{index}.json",
+                [{"@id": "#run", "result": [{"@id": f"out-{index}"}]}],
+            )
+            for index in range(crates)
+        ]
+        serialized = []
+        value_key = merge._value_key
+        monkeypatch.setattr(
+            merge,
+            "_value_key",
+            lambda value: serialized.append(value) or value_key(value),
+        )
+        output = tmp_path / "merged.json"
+
+        merge_crates(paths, str(output))
+
+        with open(output) as file:
+            run = read_graph(file)[0]
+        assert run["result"] == [{"@id": f"out-{index}"} for index in range(crates)]
+        assert len(serialized) == crates
+
+    def test_input_descriptor_is_merged(self, tmp_path):
+        """The inputs' descriptors are merged but keep describing the root."""
+        crate = write_crate(
+            tmp_path / "crate.json",
+            [
+                {
+                    "@id": "ro-crate-metadata.json",
+                    "@type": "CreativeWork",
+                    "conformsTo": [
+                        {"@id": "https://w3id.org/ro/crate/1.1"},
+                        {"@id": "https://w3id.org/ro/wfrun/process/0.5"},
+                    ],
+                    "about": {"@id": "./old"},
+                },
+                {"@id": "./", "@type": ["Dataset", "Thing"], "name": "runs"},
+            ],
+        )
+        output = tmp_path / "merged.json"
+
+        assert merge_crates([crate], str(output)) == 0
+
+        with open(output) as file:
+            merged_descriptor, root = read_graph(file)
+        assert merged_descriptor["about"] == {"@id": "./"}
+        assert {"@id": "https://w3id.org/ro/wfrun/process/0.5"} in merged_descriptor[
+            "conformsTo"
+        ]
+        assert root == {
+            "@id": "./",
+            "@type": ["Dataset", "Thing"],
+            "name": "runs",
+            "hasPart": [],
+        }
+
+    def test_output_passes_check(self, tmp_path):
+        """The merged crate has the descriptor and root that ``check`` expects."""
+        flat = tmp_path / "task.json"
+        flat.write_text(json.dumps({"@id": "task", "@type": "Dataset"}))
+        output = tmp_path / "merged.json"
+
+        merge_crates([str(flat)], str(output))
+
+        assert ProfileValidator().validate(json.loads(output.read_text())) == []
+
+    def test_flat_wrroc_and_ndjson_inputs(self, tmp_path):
+        """Converter outputs and NDJSON files are merged as entities."""
+        flat = tmp_path / "task.json"
+        flat.write_text(json.dumps({"@id": "task", "status": "QUEUED"}))
+        ndjson = tmp_path / "tasks.ndjson"
+        ndjson.write_text(json.dumps({"@id": "task", "status": "COMPLETE"}) + "\n")
+        output = tmp_path / "merged.json.xz"
+
+        merge_crates([str(flat), str(ndjson)], str(output))
+
+        with open_input(output) as file:
+            graph = read_graph(file)
+        assert graph[0] == {"@id": "task", "status": "COMPLETE"}
+        assert graph[-1]["hasPart"] == [{"@id": "task"}]
+
+    def test_empty(self, tmp_path):
+        """Merging crates without entities writes only the descriptor and root."""
+        empty = write_crate(tmp_path / "empty.json", [])
+        output = tmp_path / "merged.json"
+
+        assert merge_crates([empty], str(output)) == 0
+        with open(output) as file:
+            assert read_graph(file) == [
+                descriptor,
+                {"@id": "./", "@type": "Dataset", "hasPart": []},
+            ]
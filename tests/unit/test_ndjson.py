@@ -0,0 +1,190 @@
+"""NDJSON UNIT TESTS"""
+
+import json
+
+import pytest
+
+from crategen.compression import open_input, open_output
+from crategen.ndjson import convert_ndjson, shard_path, split_ranges
+
+
+def write_tasks(path, count):
+    """Write ``count`` TES tasks to an NDJSON file and return them."""
+    tasks = [
+        {"id": f"task-{i}", "executors": [{"image": f"image-{i}"}]}
+        for i in range(count)
+    ]
+    path.write_text("".join(json.dumps(task) + "\n" for task in tasks))
+    return tasks
+
+
+class TestSplitRanges:
+    """Test suite for newline-aligned range splitting."""
+
+    @pytest.mark.parametrize("parts", [1, 2, 3, 7, 50])
+    def test_ranges_cover_lines(self, tmp_path, parts):
+        """Ranges are contiguous, cover the file and start at line boundaries."""
+        path = tmp_path / "tasks.ndjson"
+        write_tasks(path, 20)
+        content = path.read_bytes()
+
+        ranges = split_ranges(path, parts)
+
+        assert 1 <= len(ranges) <= parts
+        assert ranges[0][0] == 0
+        assert ranges[-1][1] == len(content)
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            assert end == start
+            assert content[start - 1 : start] == b"\n"
+
+    def test_empty_file(self, tmp_path):
+        """An empty file has no ranges."""
+        path = tmp_path / "empty.ndjson"
+        path.write_bytes(b"")
+
+        assert split_ranges(path, 4) == []
+
+
+class TestConvertNDJSON:
+    """Test suite for parallel NDJSON conversion."""
+
+    def test_merged_output_order(self, tmp_path):
+        """Merged output preserves the input order."""
+        input_path = tmp_path / "tasks.ndjson"
+        output_path = tmp_path / "crates.ndjson"
+        tasks = write_tasks(input_path, 25)
+
+        count, paths = convert_ndjson(
+            input_path, output_path, "tes-to-wrroc", workers=3
+        )
+
+        assert count == len(tasks)
+        assert paths == [output_path]
+        crates = [json.loads(line) for line in output_path.read_text().splitlines()]
+        assert [crate["@id"] for crate in crates] == [task["id"] for task in tasks]
+        assert not list(tmp_path.glob("crates.ndjson.part-*"))
+
+    def test_unmerged_shards(self, tmp_path):
+        """Without merging, one shard is written per range."""
+        input_path = tmp_path / "tasks.ndjson"
+        output_path = tmp_path / "crates.ndjson"
+        write_tasks(input_path, 10)
+
+        count, paths = convert_ndjson(
+            input_path, output_path, "tes-to-wrroc", workers=2, merge=False
+        )
+
+        assert paths == [shard_path(output_path, 0), shard_path(output_path, 1)]
+        lines = []
+        for path in paths:
+            with open(path) as shard:
+                lines.extend(shard.read().splitlines())
+        assert len(lines) == count
+
+    def test_invalid_record(self, tmp_path):
+        """Invalid records are reported with their byte offset."""
+        input_path = tmp_path / "tasks.ndjson"
+        input_path.write_text('{"id": "task"}\n{invalid\n')
+
+        with pytest.raises(ValueError) as exc_info:
+            convert_ndjson(
+                input_path, tmp_path / "out.ndjson", "tes-to-wrroc", workers=1
+            )
+
+        assert "Invalid JSON record at byte offset 15" in str(exc_info.value)
+
+    def test_validate_input(self, tmp_path):
+        """Records are validated with the TES models in the workers when requested."""
+        input_path = tmp_path / "tasks.ndjson"
+        task = {"id": "task", "executors": [{"image": "ubuntu", "command": ["true"]}]}
+        input_path.write_text(json.dumps(task) + "\n" + '{"id": "no-executors"}\n')
+
+        convert_ndjson(input_path, tmp_path / "lax.ndjson", "tes-to-wrroc", workers=1)
+        with pytest.raises(ValueError) as exc_info:
+            convert_ndjson(
+                input_path,
+                tmp_path / "out.ndjson",
+                "tes-to-wrroc",
+                workers=1,
+                validate_input=True,
+            )
+
+        offset = len(json.dumps(task)) + 1
+        assert f"Invalid input record at byte offset {offset}" in str(exc_info.value)
+        assert "executors" in str(exc_info.value)
+
+    def test_validate_input_projection(self, tmp_path):
+        """Collections no requested field reads are not validated."""
+        input_path = tmp_path / "tasks.ndjson"
+        task = {
+            "id": "task",
+            "state": "COMPLETE",
+            "executors": [{"image": "ubuntu", "command": ["true"]}],
+            "inputs": [{"path": "relative"}],
+        }
+        input_path.write_text(json.dumps(task) + "\n")
+        output_path = tmp_path / "out.ndjson"
+
+        convert_ndjson(
+            input_path,
+            output_path,
+            "tes-to-wrroc",
+            workers=1,
+            fields=("@id", "status"),
+            validate_input=True,
+        )
+
+        assert json.loads(output_path.read_text()) == {
+            "@id": "task",
+            "status": "COMPLETE",
+        }
+        with pytest.raises(ValueError):
+            convert_ndjson(
+                input_path,
+                output_path,
+                "tes-to-wrroc",
+                workers=1,
+                fields=("@id", "object"),
+                validate_input=True,
+            )
+
+    def test_validate_input_unsupported(self, tmp_path):
+        """Input validation is rejected for conversion types without input models."""
+        input_path = tmp_path / "runs.ndjson"
+        input_path.write_text('{"run_id": "run"}\n')
+
+        with pytest.raises(ValueError) as exc_info:
+            convert_ndjson(
+                input_path, tmp_path / "out.ndjson", "wes-to-wrroc", validate_input=True
+            )
+
+        assert "Input validation is not supported for 'wes-to-wrroc'" in str(
+            exc_info.value
+        )
+
+    def test_compressed_input_and_output(self, tmp_path):
+        """Compressed inputs are streamed and outputs compressed by extension."""
+        input_path = tmp_path / "tasks.ndjson.xz"
+        output_path = tmp_path / "crates.ndjson.gz"
+        tasks = [{"id": f"task-{i}", "executors": [{"image": "x"}]} for i in range(5)]
+        with open_output(input_path) as file:
+            file.write("".join(json.dumps(task) + "\n" for task in tasks))
+
+        count, paths = convert_ndjson(input_path, output_path, "tes-to-wrroc")
+
+        assert count == len(tasks)
+        assert paths == [output_path]
+        with open_input(output_path) as file:
+            crates = [json.loads(line) for line in file]
+        assert [crate["@id"] for crate in crates] == [task["id"] for task in tasks]
+
+    def test_compressed_output_merge(self, tmp_path):
+        """Shards of an uncompressed input are merged into a compressed output."""
+        input_path = tmp_path / "tasks.ndjson"
+        output_path = tmp_path / "crates.ndjson.bz2"
+        tasks = write_tasks(input_path, 8)
+
+        convert_ndjson(input_path, output_path, "tes-to-wrroc", workers=2)
+
+        with open_input(output_path) as file:
+            assert len(file.readlines()) == len(tasks)
@@ -0,0 +1,209 @@
+"""SERVER UNIT TESTS"""
+
+import http.client
+import json
+import socket
+import threading
+import time
+from http import HTTPStatus
+
+import pytest
+
+from crategen.server import (
+    MAX_REQUEST_BYTES,
+    ConversionService,
+    LatencyHistogram,
+    create_server,
+)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix domain socket."""
+
+    def __init__(self, path):
+        super().__init__("localhost")
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+def request(connection, method, path, payload=None):
+    """Send a request and return the status and decoded JSON body."""
+    body = None if payload is None else json.dumps(payload)
+    connection.request(method, path, body=body)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+@pytest.fixture(params=["tcp", "unix"])
+def connection(request, tmp_path):
+    """Start a server in a background thread and yield a connection to it."""
+    if request.param == "tcp":
+        server = create_server(port=0, workers=2)
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+    else:
+        socket_path = str(tmp_path / "crategen.sock")
+        server = create_server(socket_path=socket_path, workers=2)
+        conn = UnixHTTPConnection(socket_path)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield conn
+    conn.close()
+    server.shutdown()
+    server.server_close()
+
+
+class TestLatencyHistogram:
+    """Test suite for the latency histogram."""
+
+    def test_snapshot(self):
+        """Observations are counted in cumulative buckets."""
+        histogram = LatencyHistogram(buckets=(1, 10))
+        observations = (0.0005, 0.005, 1)
+        for seconds in observations:
+            histogram.observe(seconds)
+
+        snapshot = histogram.snapshot()
+
+        assert snapshot["buckets"] == [
+            {"le": 1, "count": 1},
+            {"le": 10, "count": 2},
+            {"le": "+Inf", "count": 3},
+        ]
+        assert snapshot["count"] == len(observations)
+        assert snapshot["sum_ms"] == pytest.approx(1005.5)
+
+
+class TestConversionServer:
+    """Test suite for the conversion server endpoints."""
+
+    def test_convert_single(self, connection, tes_task):
+        """A single payload is converted to a single WRROC object."""
+        status, body = request(connection, "POST", "/tes-to-wrroc", tes_task)
+
+        assert status == HTTPStatus.OK
+        assert body["@id"] == "task-id"
+        assert body["instrument"] == "ubuntu:20.04"
+
+    def test_convert_batch(self, connection, tes_task):
+        """A list of payloads is converted in order."""
+        tasks = [{**tes_task, "id": f"task-{i}"} for i in range(3)]
+        status, body = request(connection, "POST", "/tes-to-wrroc", tasks)
+
+        assert status == HTTPStatus.OK
+        assert [item["@id"] for item in body] == ["task-0", "task-1", "task-2"]
+
+    def test_invalid_payload(self, connection):
+        """Malformed JSON and unconvertible payloads are rejected."""
+        connection.request("POST", "/wes-to-wrroc", body="{")
+        response = connection.getresponse()
+        response.read()
+        assert response.status == HTTPStatus.BAD_REQUEST
+
+        status, body = request(connection, "POST", "/wes-to-wrroc", "run")
+        assert status == HTTPStatus.UNPROCESSABLE_ENTITY
+        assert "Conversion failed" in body["error"]
+
+    @pytest.mark.parametrize("length", ["abc", "-1"])
+    def test_invalid_content_length(self, connection, length):
+        """Malformed or negative lengths are answered with 400."""
+        connection.request("POST", "/tes-to-wrroc", headers={"Content-Length": length})
+        response = connection.getresponse()
+
+        assert response.status == HTTPStatus.BAD_REQUEST
+        assert "Invalid Content-Length" in json.loads(response.read())["error"]
+
+    def test_oversized_body(self, connection):
+        """Bodies over the size limit are rejected without being read."""
+        length = str(MAX_REQUEST_BYTES + 1)
+        connection.request("POST", "/tes-to-wrroc", headers={"Content-Length": length})
+        response = connection.getresponse()
+
+        assert response.status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        assert "Request body exceeds" in json.loads(response.read())["error"]
+
+    def test_unknown_path(self, connection, tes_task):
+        """Unknown paths return 404."""
+        status, _ = request(connection, "POST", "/tes-to-wes", tes_task)
+
+        assert status == HTTPStatus.NOT_FOUND
+
+    def test_metrics(self, connection, tes_task):
+        """Conversion requests are recorded in the latency histogram."""
+        request(connection, "POST", "/tes-to-wrroc", tes_task)
+        status, body = request(connection, "GET", "/metrics")
+
+        assert status == HTTPStatus.OK
+        assert body["count"] == 1
+        assert body["buckets"][-1] == {"le": "+Inf", "count": 1}
+
+
+class TestConversionService:
+    """Test suite for limiting concurrent conversions."""
+
+    def test_workers_bound_concurrency(self):
+        """Conversions run on the calling threads, at most ``workers`` at once."""
+        workers = 2
+        service = ConversionService(workers=workers)
+        lock = threading.Lock()
+        active = []
+        peak = []
+        threads = []
+
+        def convert(conversion_type, payload):
+            with lock:
+                active.append(payload)
+                peak.append(len(active))
+            time.sleep(0.01)
+            with lock:
+                active.remove(payload)
+            return threading.current_thread().name
+
+        service.manager.convert = convert
+        results = {}
+        for index in range(6):
+            name = f"handler-{index}"
+            thread = threading.Thread(
+                target=lambda i=index: results.update(
+                    {i: service.convert("tes-to-wrroc", i)}
+                ),
+                name=name,
+            )
+            threads.append(thread)
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert max(peak) <= workers
+        assert results == {index: f"handler-{index}" for index in range(6)}
+
+
+class TestUnixSocket:
+    """Test suite for binding the server to a Unix domain socket."""
+
+    def test_stale_socket_is_replaced(self, tmp_path):
+        """A socket file left behind by an earlier server is replaced and removed on close."""
+        socket_path = str(tmp_path / "crategen.sock")
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(socket_path)
+        stale.close()
+
+        server = create_server(socket_path=socket_path, workers=1)
+        server.server_close()
+
+        assert not (tmp_path / "crategen.sock").exists()
+
+    def test_regular_file_is_kept(self, tmp_path):
+        """An existing file that is not a socket is never deleted."""
+        keep = tmp_path / "keep.txt"
+        keep.write_text("data")
+
+        with pytest.raises(FileExistsError) as exc_info:
+            create_server(socket_path=str(keep), workers=1)
+
+        assert "is not a Unix domain socket" in str(exc_info.value)
+        assert keep.read_text() == "data"
@@ -0,0 +1,206 @@
+"""VALIDATION UNIT TESTS"""
+
+import json
+
+import pytest
+
+from crategen.compression import open_output
+from crategen.converter_manager import ConverterManager
+from crategen.validation import (
+    CREATE_ACTION_TYPE,
+    ProfileValidator,
+    ValidationIssue,
+    WRROCValidationError,
+    iter_records,
+)
+
+
+class TestProfileValidator:
+    """Test suite for validating WRROC entities against the profile."""
+
+    def test_converter_output_conforms(self, tes_task, wes_run):
+        """Full TES and WES conversions pass validation as a CreateAction."""
+        manager = ConverterManager()
+        validator = ProfileValidator(assume_type=CREATE_ACTION_TYPE)
+
+        run = {
+            **wes_run,
+            "request": {"workflow_url": "https://example.org/workflow.cwl"},
+        }
+
+        assert validator.validate(manager.convert("tes-to-wrroc", tes_task)) == []
+        assert validator.validate(manager.convert("wes-to-wrroc", run)) == []
+
+    def test_violations(self):
+        """Missing required properties and malformed values are reported."""
+        entity = {
+            "@id": "task-id",
+            "@type": CREATE_ACTION_TYPE,
+            "startTime": "2020-10-02T16:00:00+00:00Z",
+            "actionStatus": "COMPLETE",
+            "object": [{"name": "input"}],
+        }
+
+        issues = ProfileValidator().validate(entity)
+
+        assert [(issue.entity_id, issue.property) for issue in issues] == [
+            ("task-id", "instrument"),
+            ("task-id", "actionStatus"),
+            ("task-id", "object"),
+            ("task-id", "startTime"),
+        ]
+        assert str(issues[0]) == "task-id: instrument: is required"
+
+    def test_missing_type(self):
+        """A missing @type is reported unless a type is assumed."""
+        entity = {"@id": "task-id", "instrument": {"@id": "ubuntu:20.04"}}
+
+        assert ProfileValidator().validate(entity) == [
+            ValidationIssue("task-id", "@type", "is required")
+        ]
+        assert ProfileValidator().validate({"@id": "task-id", "@type": [""]}) == [
+            ValidationIssue(
+                "task-id", "@type", "must be a type name or a list of type names"
+            )
+        ]
+        assert ProfileValidator(assume_type=CREATE_ACTION_TYPE).validate(entity) == []
+
+    @pytest.mark.parametrize(
+        "entity_type", [[{"a": 1}], {"@id": "CreateAction"}, ["CreateAction", 1]]
+    )
+    def test_malformed_type(self, entity_type):
+        """Unhashable or non-string types are reported instead of raising."""
+        issues = ProfileValidator().validate({"@id": "x", "@type": entity_type})
+
+        assert issues == [
+            ValidationIssue("x", "@type", "must be a type name or a list of type names")
+        ]
+
+    def test_assumed_type_is_required_to_match(self):
+        """Records without @type are checked against the assumed type."""
+        validator = ProfileValidator(assume_type=CREATE_ACTION_TYPE)
+
+        assert validator.validate({"@id": "task-id"}) == [
+            ValidationIssue("task-id", "instrument", "is required")
+        ]
+
+    def test_projection(self):
+        """Only projected properties are checked."""
+        validator = ProfileValidator(fields=("@id", "name"))
+
+        assert validator.validate({"@id": "task-id", "name": "task"}) == []
+        assert validator.validate({"@type": CREATE_ACTION_TYPE, "name": 1}) == [
+            ValidationIssue(None, "@id", "is required"),
+            ValidationIssue(None, "name", "must be a string"),
+        ]
+
+    def test_graph_document(self):
+        """Documents need a context and a descriptor about one of their entities."""
+        document = {
+            "@graph": [
+                {
+                    "@id": "ro-crate-metadata.json",
+                    "@type": "CreativeWork",
+                    "about": {"@id": "./"},
+                },
+                {"@id": "run", "@type": "CreateAction", "instrument": "tool"},
+                {"@id": "tool"},
+            ]
+        }
+
+        issues = ProfileValidator(assume_type=CREATE_ACTION_TYPE).validate(document)
+
+        assert issues == [
+            ValidationIssue(None, "@context", "is required"),
+            ValidationIssue("tool", "@type", "is required"),
+            ValidationIssue(
+                "ro-crate-metadata.json",
+                "about",
+                "must reference the root data entity of the graph",
+            ),
+        ]
+
+    def test_sampling(self):
+        """Only every Nth record is validated."""
+        validator = ProfileValidator(every=3)
+
+        results = [validator.sample({}) for _ in range(6)]
+
+        assert [result is None for result in results] == [
+            False,
+            True,
+            True,
+            False,
+            True,
+            True,
+        ]
+
+    def test_invalid_every(self):
+        """The sampling interval must be positive."""
+        with pytest.raises(ValueError) as exc_info:
+            ProfileValidator(every=0)
+
+        assert "'every' must be at least 1" in str(exc_info.value)
+
+
+class TestInlineValidation:
+    """Test suite for validation inside the conversion pipeline."""
+
+    def test_manager_raises(self, wes_run):
+        """The manager rejects sampled output that violates the profile."""
+        manager = ConverterManager(check_every=1)
+
+        with pytest.raises(WRROCValidationError) as exc_info:
+            manager.convert("wes-to-wrroc", {**wes_run, "request": {}})
+
+        assert exc_info.value.issues == [
+            ValidationIssue("run-id", "instrument", "is required")
+        ]
+
+    def test_manager_sampling(self, tes_task):
+        """Unsampled records are not validated."""
+        manager = ConverterManager(fields=("status",), check_every=2)
+
+        manager.convert("tes-to-wrroc", tes_task)
+        assert manager.convert("tes-to-wrroc", {"state": 1}) == {"status": 1}
+
+
+class TestIterRecords:
+    """Test suite for reading records of WRROC output files."""
+
+    def test_ndjson_and_json(self, tmp_path):
+        """NDJSON lines are separate records, JSON files a single record."""
+        ndjson_path = str(tmp_path / "crates.ndjson.gz")
+        with open_output(ndjson_path) as file:
+            file.write('{"@id": "a"}\n\n{"@id": "b"}\n')
+        json_path = tmp_path / "crate.json"
+        json_path.write_text(json.dumps([{"@id": "c"}]))
+
+        assert list(iter_records(ndjson_path)) == [(1, {"@id": "a"}), (3, {"@id": "b"})]
+        assert list(iter_records(str(json_path))) == [(1, [{"@id": "c"}])]
+
+    def test_malformed_json(self, tmp_path):
+        """Malformed records are yielded as issues and later lines still read."""
+        ndjson_path = tmp_path / "crates.ndjson"
+        ndjson_path.write_text('{"@id": "a"}\n{"@id": \n{"@id": "b"}\n')
+        json_path = tmp_path / "crate.json"
+        json_path.write_text('{\n  "@id": "a",\n}')
+
+        records = list(iter_records(str(ndjson_path)))
+
+        assert records[0] == (1, {"@id": "a"})
+        assert records[1] == (
+            2,
+            ValidationIssue(None, None, "is not valid JSON: Expecting value"),
+        )
+        assert records[2] == (3, {"@id": "b"})
+        assert list(iter_records(str(json_path))) == [
+            (
+                3,
+                ValidationIssue(
+                    None,
+                    None,
+                    "is not valid JSON: Expecting property name enclosed in double quotes",
+                ),
+            )
+        ]